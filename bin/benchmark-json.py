@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import gzip
+import json
+import random
+import timeit
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Micro-benchmark of JSON backends on match summaries
+# Usage: benchmark-json.py [recorded response files (.json, .gz) or directories, e.g. <path_storage>/responses/objects]
+
+
+def make_match_summary(game_id: int) -> dict:
+    # Synthetic game summary in the size of the provider ones: 2 teams, 10 players, 30 rounds
+    rnd = random.Random(game_id)
+    teams = [{
+        'id': team_id,
+        'name': 'Team {}'.format(team_id),
+        'acronym': 'T{}'.format(team_id),
+        'image_url': 'https://cdn.example.com/teams/{}.png'.format(team_id),
+        'score': rnd.randint(0, 16),
+        'kills': rnd.randint(0, 150),
+        'tower_kills': rnd.randint(0, 11),
+        'dragon_kills': rnd.randint(0, 5),
+        'baron_kills': rnd.randint(0, 3),
+        'kill_counters': {'players': rnd.randint(0, 80), 'turrets': rnd.randint(0, 11)}
+    } for team_id in (game_id * 2, game_id * 2 + 1)]
+    players = [{
+        'player': {
+            'id': game_id * 10 + i,
+            'name': 'player_{}'.format(i),
+            'first_name': 'Žofie',
+            'last_name': 'Nováková',
+            'hometown': 'Brno, Czech Republic',
+            'image_url': 'https://cdn.example.com/players/{}.png'.format(game_id * 10 + i)
+        },
+        'team': {'id': teams[i % 2]['id']},
+        'kills': rnd.randint(0, 30),
+        'deaths': rnd.randint(0, 30),
+        'assists': rnd.randint(0, 30),
+        'creep_score': rnd.randint(0, 400),
+        'gold_earned': rnd.randint(5000, 25000),
+        'gold_per_minute': round(rnd.uniform(200, 900), 2),
+        'damage': {'dealt': rnd.randint(1000, 60000), 'taken': rnd.randint(1000, 60000)},
+        'items': [{'id': rnd.randint(1, 300), 'name': 'Item {}'.format(j)} for j in range(6)]
+    } for i in range(10)]
+    rounds = [{
+        'round': i + 1,
+        'winner_team': teams[rnd.randint(0, 1)]['id'],
+        'outcome': rnd.choice(['eliminated', 'exploded', 'defused', 'timeout']),
+        'ct': teams[i % 2]['id'],
+        'terrorists': teams[(i + 1) % 2]['id']
+    } for i in range(30)]
+    return {
+        'id': game_id,
+        'begin_at': '2020-06-16T18:00:00Z',
+        'end_at': '2020-06-16T19:00:00Z',
+        'finished': True,
+        'length': 3600,
+        'match': {
+            'id': game_id // 3, 'serie_id': 1000, 'league_id': 100, 'opponents': [{'opponent': t} for t in teams]},
+        'teams': teams,
+        'players': players,
+        'rounds': rounds,
+        'rounds_score': [{'team_id': t['id'], 'score': t['score']} for t in teams]
+    }
+
+
+def load_bodies(paths: list) -> list:
+    bodies = []
+    for path in paths:
+        file_paths = [path]
+        if os.path.isdir(path):
+            file_paths = [os.path.join(root, f) for root, _, files in os.walk(path) for f in files]
+        for file_path in file_paths:
+            opener = gzip.open if file_path.endswith('.gz') else open
+            with opener(file_path, 'rb') as fh:
+                bodies.append(fh.read())
+    return bodies
+
+
+def run_benchmark(bodies: list, number: int) -> None:
+    documents = [json.loads(body.decode('utf-8')) for body in bodies]
+    size = sum(len(body) for body in bodies)
+    print('{} documents, {:.1f} kB on average, {} rounds'.format(len(bodies), size / len(bodies) / 1024, number))
+
+    backends = [
+        ('json loads', lambda: [json.loads(body.decode('utf-8')) for body in bodies]),
+        ('json dumps', lambda: [json.dumps(document, ensure_ascii=False) for document in documents])
+    ]
+    if orjson is not None:
+        backends += [
+            ('orjson loads', lambda: [orjson.loads(body) for body in bodies]),
+            ('orjson dumps', lambda: [orjson.dumps(document).decode('utf-8') for document in documents])
+        ]
+    else:
+        print('orjson is not installed, only standard json is measured')
+
+    for name, fn in backends:
+        seconds = min(timeit.repeat(fn, number=number, repeat=3))
+        print('{:<14} {:8.2f} ms/round {:8.1f} MB/s'.format(
+            name, seconds / number * 1000, size * number / seconds / 1e6))
+
+
+if __name__ == '__main__':
+    bodies = load_bodies(sys.argv[1:])
+    if not bodies:
+        bodies = [json.dumps(make_match_summary(game_id), ensure_ascii=False).encode('utf-8') for game_id in range(50)]
+    run_benchmark(bodies, 20)
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import argparse
+
+instance_dirpath = '{}{}'.format(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'), os.sep)
+sys.path.append(instance_dirpath)
+
+from datanal.config.api_settings import api_config  # noqa: E402
+from datanal.daemon import CollectDaemon  # noqa: E402
+
+
+# Watch and collect current games in process, replaces watch-and-collect-(a)sync.py calls of the server.
+# Games are collected only while the watching flag is set (/start-watching, /finish-watching).
+# Stop it by SIGTERM or Ctrl+C, running jobs are finished first.
+
+# !!! IMPORTANT !!!
+# export GOOGLE_APPLICATION_CREDENTIALS="/data/app/config/gcp-developer.json"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Watch and collect current games')
+    parser.add_argument('--data-src', action='append', choices=api_config['data_sources'], dest='data_sources')
+    parser.add_argument('--game-name', action='append', choices=api_config['game_names'], dest='game_names')
+    parser.add_argument('--watch-interval', type=float, help='seconds')
+    parser.add_argument('--collect-interval', type=float, help='seconds')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    CollectDaemon(args.data_sources, args.game_names, args.watch_interval, args.collect_interval).run()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import argparse
+import requests
+from requests.auth import HTTPBasicAuth
+
+instance_dirpath = '{}{}'.format(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'), os.sep)
+sys.path.append(instance_dirpath)
+
+from lib import tools  # noqa: E402, F401 (imported before lib.libpool, they import each other)
+from datanal.config.api_settings import api_config  # noqa: E402
+from datanal.watcher import PUSH_EVENT_TYPES  # noqa: E402
+
+
+# Local stand-in of provider push feed, sends one event to /push-event of the server.
+# Payload is JSON file (or stdin with "-"):
+#   match_finished of provider1: {"serie": <item of series listing>, "matches": <series/<id>?with[]=matches>}
+#   match_finished of provider2: {"match": <item of <slug>/matches/past listing>}
+#   stats_updated: {"data_src_game_id": <game id>, "data": <game data as collected>}
+# Polling by watch-and-collect or collect-daemon.py still picks up everything the events missed.
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Push event to the server')
+    parser.add_argument('--url', default='http://127.0.0.1:80/push-event')
+    parser.add_argument('--data-src', required=True, choices=api_config['data_sources'])
+    parser.add_argument('--game-name', required=True, choices=api_config['game_names'])
+    parser.add_argument('--event-type', required=True, choices=PUSH_EVENT_TYPES)
+    parser.add_argument('--event-id', help='deduplication key, hash of the event by default')
+    parser.add_argument('payload', help='JSON file, "-" for stdin')
+    return parser.parse_args()
+
+
+def push_event(args: argparse.Namespace) -> str:
+    if args.payload == '-':
+        payload = json.load(sys.stdin)
+    else:
+        with open(args.payload) as fh:
+            payload = json.load(fh)
+    event = {
+        'data_src': args.data_src,
+        'game_name': args.game_name,
+        'event_type': args.event_type,
+        'event_id': args.event_id,
+        'payload': payload
+    }
+    auth = HTTPBasicAuth(os.getenv('HTTP_USER'), os.getenv('HTTP_PASSWORD'))
+    response = requests.post(args.url, json=event, auth=auth)
+    response.raise_for_status()
+    return response.json()
+
+
+if __name__ == '__main__':
+    print(push_event(parse_args()))
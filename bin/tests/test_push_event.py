@@ -0,0 +1,20 @@
+# -*- coding: UTF-8 -*-
+# flake8: noqa: E303
+
+import os
+import sys
+import subprocess
+
+
+bin_dirpath = '{}{}'.format(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'), os.sep)
+
+
+class TestPushEvent(object):
+
+    def test_help(self):
+        # Script loads datanal modules, which have to be importable outside of the server
+        result = subprocess.run(
+            [sys.executable, os.path.join(bin_dirpath, 'push-event.py'), '--help'],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        assert result.returncode == 0, result.stderr
+        assert '--event-type {match_finished,stats_updated}' in result.stdout
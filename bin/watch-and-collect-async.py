@@ -13,8 +13,8 @@ sys.path.append(postgre_dirpath)
 from datanal.config.api_settings import api_config
 
 
-# !!! CANNOT BE USED BECAUSE OF REQUEST LIMIT ON PROVIDER1 API !!!
-# Instead of this script use "watch-and-collect-sync.py" please.
+# Provider rate limits are honored by the server (see PROVIDERx_RATE_LIMITER), with more uWSGI processes
+# use the "file" rate limiter backend so all of them share one quota.
 
 # !!! IMPORTANT !!!
 # export GOOGLE_APPLICATION_CREDENTIALS="/data/app/config/gcp-developer.json"
@@ -40,10 +40,10 @@ def start_process():
     for data_src in api_config['data_sources']:
         for game_name in api_config['game_names']:
             task_watch = asyncio.ensure_future(
-                '{}?data_src={}&game_name={}'.format(async_hit_url(server_url_watch), data_src, game_name))
+                async_hit_url('{}?data_src={}&game_name={}'.format(server_url_watch, data_src, game_name)))
             tasks.append(task_watch)
             task_collect = asyncio.ensure_future(
-                '{}?data_src={}&game_name={}'.format(async_hit_url(server_url_collect), data_src, game_name))
+                async_hit_url('{}?data_src={}&game_name={}'.format(server_url_collect, data_src, game_name)))
             tasks.append(task_collect)
     loop.run_until_complete(asyncio.wait(tasks))
     # calc_data = loop.run_until_complete(asyncio.gather(*tasks))
@@ -0,0 +1,123 @@
+# -*- coding: UTF-8 -*-
+
+import asyncio
+
+import cherrypy
+try:
+    import aiohttp
+except ImportError:  # Optional package, requests are sent one by one without it
+    aiohttp = None
+
+from lib import tools
+from datanal.config.api_settings import api_config
+from datanal.tools import to_json, from_json
+from datanal.client.session import SessionPool
+from datanal.client.scheduler import get_request_context
+
+
+class AsyncRestClient(object):
+    '''Asynchronous provider client with bounded concurrency
+
+    Keeps up to `max_concurrency` requests in flight, each of them takes a token from the provider
+    rate limiter before it is sent, so the quota is honored the same way as in `send_request`.
+    Provider specific parts (URL, authentication, response checks) are taken from the synchronous client.
+    '''
+
+    def __init__(self, client: object, pool: object):
+        self._client = client
+        self._pool = pool
+
+
+    @property
+    def max_concurrency(self) -> int:
+        return api_config[self._client._name]['max_concurrency']
+
+
+    async def _wait_for_permission(self, context: tuple) -> None:
+        # Scheduler blocks, so it waits in executor thread, the event loop keeps serving other requests
+        await asyncio.get_event_loop().run_in_executor(None, self._pool.acquire, *context)
+
+
+    async def _get(self, session: object, api_endpoint: str, url: str, data: dict, context: tuple) -> tuple:
+        if self._pool.http_mode == 'replay':
+            status, headers, body = self._pool.store.load(api_endpoint, data)  # No network, no rate limit
+            return status, headers, from_json(body)
+
+        retry = self._pool.retry
+        attempt = 0
+        while True:
+            await self._wait_for_permission(context)
+            try:
+                async with session.get(url, data=to_json(data)) as response:
+                    status, headers, body = response.status, response.headers, await response.read()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if not retry.should_retry(attempt):
+                    raise
+                status, headers, reason = None, None, str(e) or type(e).__name__
+            else:
+                self._pool.adapt(status, headers)
+                if not retry.should_retry(attempt, status):
+                    retry.check_exhausted(attempt, status, response.reason)
+                    break
+                reason = response.reason
+            delay = retry.get_delay(attempt, headers, status)
+            if retry.is_throttled(status, headers):
+                self._pool.limiter.pause(delay)  # Next token of any request comes after the delay
+            else:
+                await asyncio.sleep(delay)
+            attempt += 1
+            self._client._logging('Retry {}/{} after {:.2f}s: {} {}'.format(
+                attempt, retry.max_retries, delay, status, reason), url, 'error')
+
+        if self._pool.http_mode == 'record':
+            self._pool.store.save(api_endpoint, data, status, headers, body)
+        return status, headers, from_json(body)
+
+
+    async def _send_request(
+            self, session: object, semaphore: asyncio.Semaphore, api_endpoint: str, data: dict,
+            context: tuple) -> tuple:
+        key = (api_endpoint, to_json(data))
+        cached = self._pool.singleflight.get(key)
+        if cached is not None:
+            return cached
+
+        async with semaphore:
+            url = self._client._build_url(api_endpoint)
+            try:
+                status, headers, body = await self._get(session, api_endpoint, url, data, context)
+                if self._client._is_token_invalid(status, body):
+                    self._client._reauthenticate(url, body)
+                    url = self._client._build_url(api_endpoint)
+                    status, headers, body = await self._get(session, api_endpoint, url, data, context)
+                self._client._check_response(status, body)
+            except cherrypy.HTTPError:
+                raise
+            except Exception as e:
+                self._client._request_error(e, url)
+            self._pool.singleflight.set(key, (headers, body))
+            return headers, body
+
+
+    async def send_requests_async(self, api_endpoints: list, data: dict = {}, context: tuple = None) -> list:
+        if context is None:
+            context = get_request_context()  # Job type and game of the calling thread
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+        async with aiohttp.ClientSession(connector=connector, headers=SessionPool.default_headers) as session:
+            return await asyncio.gather(*[
+                self._send_request(session, semaphore, api_endpoint, data, context) for api_endpoint in api_endpoints])
+
+
+    def send_requests(self, api_endpoints: list, data: dict = {}) -> list:
+        if aiohttp is None or self.max_concurrency <= 1 or len(api_endpoints) <= 1:
+            return [self._client.send_request(api_endpoint, data) for api_endpoint in api_endpoints]
+
+        # Private event loop, so it can be called from CherryPy worker threads
+        loop = asyncio.new_event_loop()
+        try:
+            results = loop.run_until_complete(self.send_requests_async(api_endpoints, data))
+        finally:
+            loop.close()
+        tools.check_request_timeout()  # Application hook to return 408 if time is over
+        return results
@@ -0,0 +1,66 @@
+# -*- coding: UTF-8 -*-
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from datanal.client.scheduler import request_context, get_request_context
+
+
+class FetchIterator(object):
+    '''Fetch items by bounded worker pool, yields (item, result, error) in order of items
+
+    `fetch(item)` is called in up to `max_workers` threads, each request goes through the provider rate limiter
+    with the job type and game of the caller. At most 2 * `max_workers` results wait for the consumer,
+    so the consumer (single writer) keeps the memory bounded. Exception of one fetch is yielded as its `error`
+    and does not stop the others. With `max_workers` <= 1 items are fetched one by one in the calling thread.
+    '''
+
+    def __init__(self, fetch: callable, items: list, max_workers: int = 4):
+        self._fetch = fetch
+        self._items = items
+        self._max_workers = max_workers
+
+
+    def _fetch_in_context(self, context: tuple, item: object) -> object:
+        with request_context(*context):
+            return self._fetch(item)
+
+
+    def _iter_sequential(self) -> iter:
+        for item in self._items:
+            try:
+                result = self._fetch(item)
+            except Exception as e:
+                yield item, None, e
+            else:
+                yield item, result, None
+
+
+    def __iter__(self) -> iter:
+        if self._max_workers <= 1:
+            yield from self._iter_sequential()
+            return
+
+        context = get_request_context()
+        executor = ThreadPoolExecutor(max_workers=self._max_workers)
+        pending = deque()
+        items = iter(self._items)
+        try:
+            while True:
+                for item in items:
+                    pending.append((item, executor.submit(self._fetch_in_context, context, item)))
+                    if len(pending) >= 2 * self._max_workers:
+                        break
+                if not pending:
+                    return
+                item, future = pending.popleft()
+                try:
+                    result = future.result()
+                except Exception as e:
+                    yield item, None, e
+                else:
+                    yield item, result, None
+        finally:
+            for item, future in pending:
+                future.cancel()  # Not started fetches of abandoned iteration are dropped
+            executor.shutdown(wait=False)
@@ -0,0 +1,50 @@
+# -*- coding: UTF-8 -*-
+
+from concurrent.futures import ThreadPoolExecutor
+
+from datanal.client.scheduler import request_context, get_request_context
+
+
+class PageIterator(object):
+    '''Iterate numbered pages of provider listing, yields (page, headers, data)
+
+    `fetch(page)` returns (headers, data) of the page, `last_page(headers, data)` number of the last page.
+    With `prefetch` the next page is fetched in background thread while the caller processes the current one,
+    its request goes through the same rate limiter with the job type and game of the caller.
+    `stop(headers, data)` returning True ends the iteration after the page, next pages are not fetched.
+    '''
+
+    def __init__(
+            self, fetch: callable, last_page: callable, stop: callable = None, prefetch: bool = True,
+            first_page: int = 1):
+        self._fetch = fetch
+        self._last_page = last_page
+        self._stop = stop
+        self._prefetch = prefetch
+        self._first_page = first_page
+
+
+    def _fetch_in_context(self, context: tuple, page: int) -> tuple:
+        with request_context(*context):
+            return self._fetch(page)
+
+
+    def __iter__(self) -> iter:
+        executor = ThreadPoolExecutor(max_workers=1) if self._prefetch else None
+        context = get_request_context()
+        page = self._first_page
+        try:
+            headers, data = self._fetch(page)
+            while True:
+                has_next = page < self._last_page(headers, data) and not (self._stop and self._stop(headers, data))
+                future = None
+                if has_next and executor is not None:
+                    future = executor.submit(self._fetch_in_context, context, page + 1)
+                yield page, headers, data
+                if not has_next:
+                    return
+                page += 1
+                headers, data = future.result() if future is not None else self._fetch(page)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)  # Prefetched page of abandoned iteration is dropped
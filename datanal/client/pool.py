@@ -0,0 +1,151 @@
+# -*- coding: UTF-8 -*-
+
+import time
+
+import requests
+
+from datanal.config.api_settings import api_config
+from datanal.tools import to_json
+from datanal.client.ratelimiter import TokenBucket, get_rate_limiter, get_adaptive_rate
+from datanal.client.session import SessionPool
+from datanal.client.singleflight import SingleFlight
+from datanal.client.recorder import ResponseStore
+from datanal.client.retry import RetryPolicy, get_retry_policy
+from datanal.client.scheduler import RequestScheduler, get_request_context
+
+
+class ProviderPool(object):
+    '''Resources shared by all clients of one provider in the process
+
+    Rate limiter with request scheduler, retry policy, keep-alive HTTP sessions, single-flight cache
+    and recorded responses store.
+    '''
+    _name = None
+
+    def __init__(self):
+        ac = api_config[self._name]
+        self._limiter = get_rate_limiter(self._name)
+        self._adaptive_rate = get_adaptive_rate(self._name, self._limiter)
+        self._scheduler = RequestScheduler(self._limiter)
+        self._retry = get_retry_policy(self._name)
+        self._session_pool = SessionPool(ac['pool_size'])
+        self._singleflight = SingleFlight(ac['cache_ttl'])
+        self._store = ResponseStore(self._name)
+
+
+    @property
+    def request_permission(self) -> bool:
+        # Block until the rate limiter grants a token for the next request
+        return self.acquire()
+
+
+    def acquire(self, job_type: str = None, game: str = None) -> bool:
+        # Wait for the rate limiter token in scheduler order, job type and game of the thread by default
+        if job_type is None:
+            job_type, game = get_request_context()
+        return self._scheduler.acquire(job_type, game)
+
+
+    def try_request_permission(self) -> bool:
+        # Non-blocking variant, returns False when the rate limit is exhausted now
+        return self._limiter.try_acquire()
+
+
+    @property
+    def limiter(self) -> TokenBucket:
+        return self._limiter
+
+
+    @property
+    def scheduler(self) -> RequestScheduler:
+        return self._scheduler
+
+
+    @property
+    def retry(self) -> RetryPolicy:
+        return self._retry
+
+
+    @property
+    def session(self) -> SessionPool:
+        return self._session_pool
+
+
+    @property
+    def singleflight(self) -> SingleFlight:
+        return self._singleflight
+
+
+    @property
+    def store(self) -> ResponseStore:
+        return self._store
+
+
+    @property
+    def http_mode(self) -> str:
+        # live - provider API only, record - provider API and save responses, replay - saved responses only
+        return api_config[self._name]['http_mode']
+
+
+    def adapt(self, status_code: int = None, headers: dict = None) -> None:
+        # Feed quota headers of every response into the adaptive rate
+        if self._adaptive_rate is None:
+            return
+        if status_code == 429:
+            self._adaptive_rate.throttled()
+        else:
+            self._adaptive_rate.update(headers)
+
+
+    def backoff(self, attempt: int, status_code: int = None, headers: dict = None) -> float:
+        # Wait before next attempt, throttling signals slow down all requests of the provider
+        delay = self._retry.get_delay(attempt, headers, status_code)
+        if self._retry.is_throttled(status_code, headers):
+            self._limiter.pause(delay)  # Next token of any thread comes after the delay
+        else:
+            time.sleep(delay)
+        return delay
+
+
+    def get(
+            self, api_endpoint: str, url: str, data: dict = {}, log: callable = None,
+            stream: bool = False) -> requests.Response:
+        # With `stream` the body is not read yet, caller reads it from `response.raw`
+        if self.http_mode == 'replay':
+            return self._store.load_response(api_endpoint, data, url)  # No network, no rate limit
+        attempt = 0
+        while True:
+            self.acquire()
+            try:
+                response = self._session_pool.get(url, data=to_json(data), stream=stream)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if not self._retry.should_retry(attempt):
+                    raise
+                status_code, headers, reason = None, None, str(e)
+            else:
+                self.adapt(response.status_code, response.headers)
+                if not self._retry.should_retry(attempt, response.status_code):
+                    self._retry.check_exhausted(attempt, response.status_code, response.reason)
+                    break
+                status_code, headers, reason = response.status_code, response.headers, response.reason
+                response.close()  # Connection goes back to the pool without the body of the failed attempt
+            delay = self.backoff(attempt, status_code, headers)
+            attempt += 1
+            if log:
+                log('Retry {}/{} after {:.2f}s: {} {}'.format(
+                    attempt, self._retry.max_retries, delay, status_code, reason), url, 'error')
+
+        if self.http_mode == 'record':
+            self._store.save_response(api_endpoint, data, response)
+        return response
+
+
+    def stats(self) -> dict:
+        return {
+            'http_mode': self.http_mode,
+            'adaptive_rate': self._adaptive_rate is not None,
+            'limiter': self._limiter.stats(),
+            'scheduler': self._scheduler.stats(),
+            'session': self._session_pool.stats(),
+            'singleflight': self._singleflight.stats()
+        }
@@ -1,7 +1,7 @@
 # -*- coding: UTF-8 -*-
 
-import requests
 import time
+from urllib.parse import urlsplit, parse_qs
 
 import cherrypy
 
@@ -9,12 +9,10 @@ from lib.libpool import LibPool
 from lib import tools
 from datanal.config.api_settings import api_config
 from datanal.connector import RestClientInterface
-from datanal.tools import to_json
+from datanal.tools import to_json, from_json
 from datanal.client.provider1pool import Provider1Pool
-
-
-class AuthenticationError(Exception):
-    pass
+from datanal.client.asyncclient import AsyncRestClient
+from datanal.client.token import AuthenticationError  # noqa: F401
 
 
 class RestClient(RestClientInterface):
@@ -27,6 +25,7 @@ class RestClient(RestClientInterface):
         cherrypy.thread_data.client_obj = self
         if 'log' in kwargs:
             self._log = kwargs['log']
+        self._async_client = AsyncRestClient(self, self._abiospool)
         super().__init__(*args, **kwargs)
 
 
@@ -49,7 +48,11 @@ class RestClient(RestClientInterface):
             self.logger.info(message, logdata)
 
 
-    def send_request(self, api_endpoint: str, data: dict = {}) -> dict:
+    def _get_pool(self) -> object:
+        return self._abiospool
+
+
+    def _build_url(self, api_endpoint: str) -> str:
         auth_token = self._abiospool.auth_token
         if auth_token is None:
             # Auth token does not exists, get new one
@@ -64,46 +67,76 @@ class RestClient(RestClientInterface):
         url_start = '{}{}?'.format(ac['url'], api_endpoint)
         if '?' in api_endpoint:
             url_start = '{}&'.format(url_start[0:-1])
-        url = '{}access_token={}'.format(url_start, auth_token)
-        if self._abiospool.request_permission:
-            response = requests.get(url, data=to_json(data))
-        if response.status_code == 401 and response.json()['error_description'] == 'Access token is not valid.':
-            # Unauthorized -> authenticate & repeat request
-            error_message = 'Provider 2 Unauthorized: {} {}'.format(response.json()['error_description'], auth_token)
-            self._logging(error_message, url, 'error')
-            info_message = 'Reconnect to Provider 2'
-            self._logging(info_message)
-            self.authenticate()
-            response = requests.get(url, data=to_json(data))
+        return '{}access_token={}'.format(url_start, auth_token)
+
+
+    def _is_token_invalid(self, status_code: int, data: dict) -> bool:
+        return status_code == 401 and data.get('error_description') == 'Access token is not valid.'
+
+
+    def _reauthenticate(self, url: str, data: dict) -> None:
+        # Unauthorized -> authenticate, caller repeats request with a new token
+        stale_token = parse_qs(urlsplit(url).query).get('access_token', [None])[0]
+        error_message = 'Provider 2 Unauthorized: {} {}'.format(data['error_description'], stale_token)
+        self._logging(error_message, url, 'error')
+        info_message = 'Reconnect to Provider 2'
+        self._logging(info_message)
+        self.authenticate(stale_token)  # Token is fetched once, even if more threads were rejected
 
+
+    def _request_error(self, e: Exception, url: str) -> None:
+        error_message = 'Request to Provider 2 was not succesfull: {}'.format(e)
+        self._logging(error_message, url, 'error')
+        raise cherrypy.HTTPError(500, error_message)
+
+
+    def send_request(self, api_endpoint: str, data: dict = {}) -> dict:
+        # Concurrent calls of the same endpoint share one HTTP request (and its short-lived cached result),
+        # time limit is checked in the thread of each caller, so the leader's timeout is not shared
+        result = self._abiospool.singleflight.do(
+            (api_endpoint, to_json(data)), lambda: self._send_request(api_endpoint, data))
         tools.check_request_timeout()  # Application hook to return 408 if time is over
-        return response.headers, response.json()
+        return result
+
+
+    def _send_request(self, api_endpoint: str, data: dict = {}) -> dict:
+        url = self._build_url(api_endpoint)
+        try:
+            # Transient errors and throttling are retried by the pool
+            response = self._abiospool.get(api_endpoint, url, data, self._logging)
+            body = from_json(response.content)
+            if self._is_token_invalid(response.status_code, body):
+                self._reauthenticate(url, body)
+                url = self._build_url(api_endpoint)
+                response = self._abiospool.get(api_endpoint, url, data, self._logging)
+                body = from_json(response.content)
+        except cherrypy.HTTPError:
+            raise
+        except Exception as e:
+            self._request_error(e, url)
 
+        return response.headers, body
 
-    def authenticate(self) -> None:
-        ac = api_config[self._name]
-        auth_data = {
-            'grant_type': 'client_credentials',
-            'client_id': ac['client_id'],
-            'client_secret': ac['client_secret']
-        }
-        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
-        url = '{}{}'.format(ac['url'], 'oauth/access_token')
-        try:  # Authenticate
-            response = requests.post(url, data=auth_data, headers=headers)
-            if 'error' in response.json():
-                raise AuthenticationError(response.json()['error_description'])
-
-            self._abiospool.auth_token = response.json()['access_token']
+
+    def authenticate(self, stale_token: str = None) -> None:
+        if self._abiospool.http_mode == 'replay':
+            return  # Recorded responses are keyed without credentials, see `Provider1Pool.auth_token`
+        try:  # Authenticate, token manager lets one thread fetch the token
+            self._abiospool.tokens.refresh(stale_token)
         except Exception as e:
             error_message = 'Authenticate to Provider 2 was not succesfull: {}'.format(e)
+            url = '{}{}'.format(api_config[self._name]['url'], 'oauth/access_token')
             self._logging(error_message, url, 'error')
             raise cherrypy.HTTPError(401, error_message)
 
 
+    def stats(self) -> dict:
+        return self._abiospool.stats()
+
+
     def monitor(self) -> float:
         # Try to authenticate at REST endpoint
         start_time = time.perf_counter()
-        if self.authenticate() is False:
+        if self.authenticate(self._abiospool.auth_token) is False:  # Current token is replaced, so a request is sent
             return False
         return time.perf_counter() - start_time
@@ -1,48 +1,63 @@
 # -*- coding: UTF-8 -*-
 
-import time
-import threading
+import os
 
+from config.settings import app_config
 from datanal.config.api_settings import api_config
+from datanal.tools import from_json
+from datanal.client.pool import ProviderPool
+from datanal.client.token import TokenManager, AuthenticationError
 
 
-class Provider1Pool(object):
-    _auth_token = None
-    _request_start = None
-    _request_permission = True
+class Provider1Pool(ProviderPool):
+    _name = 'provider1'
 
     def __init__(self):
-        self._lock = threading.Lock()
+        super().__init__()
+        ac = api_config[self._name]
+        cache_path = None
+        if ac['token_cache']:
+            cache_path = os.path.normpath(os.path.join(
+                app_config['path_storage'], 'tmp', '{}_token.json'.format(self._name)))
+        self._tokens = TokenManager(self._fetch_token, ac['token_refresh_margin'], cache_path)
 
 
     @property
     def auth_token(self) -> str:
-        return self._auth_token
+        # Valid token or None, replayed responses are keyed without credentials,
+        # so replay does not touch the token manager (and its cache used by live runs)
+        if self.http_mode == 'replay':
+            return 'replay'
+        return self._tokens.token
 
 
     @auth_token.setter
     def auth_token(self, value: str) -> None:
-        self._auth_token = value
+        self._tokens.set(value)
 
 
     @property
-    def request_permission(self) -> str:
-        self._lock.acquire()
-        try:
-            self._request_start = time.perf_counter()
-            if self._request_permission is not True:
-                self.request_permission = True
-            self.request_permission = False
-            return True
-        finally:
-            self._request_start = None
-            self._lock.release()
-
-
-    @request_permission.setter
-    def request_permission(self, value: bool) -> None:
-        if value is True:
-            while ((time.perf_counter() - self._request_start)
-                    < (1 / api_config['provider1']['requests_per_second'])):
-                time.sleep(0.1)
-        self._request_permission = value
+    def tokens(self) -> TokenManager:
+        return self._tokens
+
+
+    def _fetch_token(self) -> tuple:
+        # OAuth client credentials grant, returns (access token, lifetime in seconds)
+        ac = api_config[self._name]
+        auth_data = {
+            'grant_type': 'client_credentials',
+            'client_id': ac['client_id'],
+            'client_secret': ac['client_secret']
+        }
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+        url = '{}{}'.format(ac['url'], 'oauth/access_token')
+        data = from_json(self._session_pool.post(url, data=auth_data, headers=headers).content)
+        if 'error' in data:
+            raise AuthenticationError(data['error_description'])
+        return data['access_token'], data.get('expires_in')
+
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats['token'] = self._tokens.stats()
+        return stats
@@ -1,6 +1,5 @@
 # -*- coding: UTF-8 -*-
 
-import requests
 import time
 
 import cherrypy
@@ -9,8 +8,9 @@ from lib.libpool import LibPool
 from lib import tools
 from datanal.config.api_settings import api_config
 from datanal.connector import RestClientInterface
-from datanal.tools import to_json
+from datanal.tools import to_json, from_json
 from datanal.client.provider2pool import Provider2Pool
+from datanal.client.asyncclient import AsyncRestClient
 
 
 class AuthenticationError(Exception):
@@ -27,6 +27,7 @@ class RestClient(RestClientInterface):
         cherrypy.thread_data.client_obj = self
         if 'log' in kwargs:
             self._log = kwargs['log']
+        self._async_client = AsyncRestClient(self, self._pandapool)
         super().__init__(*args, **kwargs)
 
 
@@ -48,40 +49,69 @@ class RestClient(RestClientInterface):
             self.logger.info(message, logdata)
 
 
-    def send_request(self, api_endpoint: str, data: dict = {}) -> dict:
+    def _get_pool(self) -> object:
+        return self._pandapool
+
+
+    def _build_url(self, api_endpoint: str) -> str:
         ac = api_config[self._name]
         url_start = '{}{}?'.format(ac['url'], api_endpoint)
         if '?' in api_endpoint:
             url_start = '{}&'.format(url_start[0:-1])
-        url = '{}token={}'.format(url_start, ac['auth_token'])
-        try:
-            if self._pandapool.request_permission:
-                response = requests.get(url, data=to_json(data))
-            if response.status_code == 401:
-                raise AuthenticationError(response.json()['error'])
-            elif 'error' in response.json():
-                raise Exception(response.json()['error'])
-        except AuthenticationError as e:
+        return '{}token={}'.format(url_start, ac['auth_token'])
+
+
+    def _check_response(self, status_code: int, data: dict) -> None:
+        if status_code == 401:
+            raise AuthenticationError(data['error'])
+        elif 'error' in data:
+            raise Exception(data['error'])
+
+
+    def _request_error(self, e: Exception, url: str) -> None:
+        if isinstance(e, AuthenticationError):
             error_message = 'Authentication error on Provider 1: {}'.format(e)
             self._logging(error_message, url, 'error')
             raise cherrypy.HTTPError(401, error_message)
-        except Exception as e:
-            error_message = 'Request to Provider 1 was not succesfull: {}'.format(e)
-            self._logging(error_message, url, 'error')
-            raise cherrypy.HTTPError(500, error_message)
+        error_message = 'Request to Provider 1 was not succesfull: {}'.format(e)
+        self._logging(error_message, url, 'error')
+        raise cherrypy.HTTPError(500, error_message)
 
+
+    def send_request(self, api_endpoint: str, data: dict = {}) -> dict:
+        # Concurrent calls of the same endpoint share one HTTP request (and its short-lived cached result),
+        # time limit is checked in the thread of each caller, so the leader's timeout is not shared
+        result = self._pandapool.singleflight.do(
+            (api_endpoint, to_json(data)), lambda: self._send_request(api_endpoint, data))
         tools.check_request_timeout()  # Application hook to return 408 if time is over
-        return response.headers, response.json()
+        return result
+
+
+    def _send_request(self, api_endpoint: str, data: dict = {}) -> dict:
+        url = self._build_url(api_endpoint)
+        try:
+            # Transient errors and throttling are retried by the pool
+            response = self._pandapool.get(api_endpoint, url, data, self._logging)
+            body = from_json(response.content)  # Decoded once
+            self._check_response(response.status_code, body)
+        except Exception as e:
+            self._request_error(e, url)
+
+        return response.headers, body
 
 
     def authenticate(self) -> None:
         # Provider 1 is always authenticated, hit lives matches to check it
         url = '{}{}'.format(api_config[self._name]['url'], 'lives')
-        response = requests.get(url)
+        response = self._pandapool.session.get(url)
         if response.status_code == 401:
             return False
 
 
+    def stats(self) -> dict:
+        return self._pandapool.stats()
+
+
     def monitor(self) -> float:
         # Try to authenticate at REST endpoint
         start_time = time.perf_counter()
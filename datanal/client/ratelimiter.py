@@ -0,0 +1,247 @@
+# -*- coding: UTF-8 -*-
+
+import os
+import time
+import struct
+import threading
+import mmap
+from contextlib import contextmanager
+
+from config.settings import app_config
+from datanal.config.api_settings import api_config
+
+
+class TokenBucket(object):
+    '''Thread-safe token bucket rate limiter
+
+    Bucket is refilled continuously by `rate` tokens per second up to `capacity` tokens,
+    so short bursts are allowed while the long term rate never exceeds `rate`.
+    '''
+
+    def __init__(self, rate: float, capacity: float = 1):
+        if rate <= 0:
+            raise ValueError('Rate limit has to be greater than zero.')
+        self._lock = threading.Lock()
+        self._rate = float(rate)
+        self._capacity = max(float(capacity), 1.0)
+        self._tokens = self._capacity
+        self._timestamp = time.monotonic()
+
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+
+    @property
+    def capacity(self) -> float:
+        return self._capacity
+
+
+    @contextmanager
+    def _locked(self):
+        # Guard the bucket state, subclasses can load and store the state from a shared storage here
+        with self._lock:
+            yield
+
+
+    def _refill(self, now: float) -> None:
+        # Caller has to hold the lock
+        elapsed = now - self._timestamp
+        if elapsed > 0:
+            self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+            self._timestamp = now
+
+
+    def reserve(self, tokens: float = 1) -> float:
+        # Take tokens immediately and return how many seconds caller has to wait until they are really available.
+        # Bucket can go negative, so concurrent callers are queued in order of their reservations.
+        with self._locked():
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self._rate
+
+
+    def acquire(self, tokens: float = 1, blocking: bool = True) -> bool:
+        if not blocking:
+            return self.try_acquire(tokens)
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)  # Sleep outside of the lock, other threads can reserve meanwhile
+        return True
+
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        with self._locked():
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+
+    def set_rate(self, rate: float) -> None:
+        with self._locked():
+            self._refill(time.monotonic())  # Tokens gained so far are counted with the old rate
+            self._rate = float(rate)
+
+
+    def pause(self, seconds: float) -> None:
+        # Provider asked to slow down, next token will be available after `seconds` at the earliest
+        with self._locked():
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, 1 - seconds * self._rate)
+
+
+    def stats(self) -> dict:
+        with self._locked():
+            self._refill(time.monotonic())
+            return {
+                'rate': self._rate,
+                'capacity': self._capacity,
+                'tokens': round(self._tokens, 3)
+            }
+
+
+class FileTokenBucket(TokenBucket):
+    '''Token bucket shared by all processes on one host
+
+    Bucket state (tokens, timestamp) lives in a memory-mapped file guarded by `flock`,
+    so every uWSGI worker takes tokens from the same bucket and the provider sees one global rate.
+    Rate and capacity are configuration, each process refills the bucket with its own ones.
+    Monotonic clock is system-wide on Linux, so timestamps are comparable between processes.
+    '''
+    _state_format = 'dd'
+
+    def __init__(self, rate: float, capacity: float = 1, file_path: str = None):
+        import fcntl  # Unix only, imported here so the thread limiter works everywhere
+        self._fcntl = fcntl
+        super().__init__(rate, capacity)
+        self._file_path = file_path
+        self._state_size = struct.calcsize(self._state_format)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)  # Storage directory of fresh checkout
+        self._fd = os.open(file_path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._fcntl.flock(self._fd, self._fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size != self._state_size:
+                # First process creates the bucket full (state of other layout is replaced too)
+                os.ftruncate(self._fd, self._state_size)
+                self._mmap = mmap.mmap(self._fd, self._state_size)
+                self._mmap[:] = struct.pack(self._state_format, self._capacity, time.monotonic())
+            else:
+                self._mmap = mmap.mmap(self._fd, self._state_size)
+        finally:
+            self._fcntl.flock(self._fd, self._fcntl.LOCK_UN)
+
+
+    def __del__(self):
+        if hasattr(self, '_mmap'):
+            self._mmap.close()
+        if hasattr(self, '_fd'):
+            os.close(self._fd)
+
+
+    @contextmanager
+    def _locked(self):
+        # Thread lock first (flock does not exclude threads sharing one file descriptor), then file lock
+        with self._lock:
+            self._fcntl.flock(self._fd, self._fcntl.LOCK_EX)
+            try:
+                self._tokens, self._timestamp = struct.unpack(self._state_format, self._mmap[:])
+                if self._timestamp > time.monotonic():
+                    # State written before reboot, monotonic clock started again
+                    self._tokens, self._timestamp = self._capacity, time.monotonic()
+                self._tokens = min(self._tokens, self._capacity)  # Capacity lowered in configuration
+                yield
+                self._mmap[:] = struct.pack(self._state_format, self._tokens, self._timestamp)
+            finally:
+                self._fcntl.flock(self._fd, self._fcntl.LOCK_UN)
+
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats['file_path'] = self._file_path
+        return stats
+
+
+class AdaptiveRate(object):
+    '''Adjust rate of the limiter from provider quota headers at runtime
+
+    Remaining quota is spread evenly over the time left to the quota reset (`safety` keeps some reserve),
+    so unused quota is spent faster than the static configuration and low quota slows requests down
+    before provider starts to reject them. Rate is always kept between `min_rate` and `max_rate`.
+    Adapted rate lives in process memory only (not in the shared limiter file), so throttling
+    never outlives the process and every new process starts from the configured rate.
+    '''
+
+    def __init__(
+            self, limiter: TokenBucket, min_rate: float, max_rate: float,
+            remaining_header: str, reset_header: str, window: float, safety: float = 0.9):
+        self._limiter = limiter
+        self._min_rate = min_rate
+        self._max_rate = max_rate
+        self._remaining_header = remaining_header
+        self._reset_header = reset_header
+        self._window = window
+        self._safety = safety
+
+
+    def _clamp(self, rate: float) -> float:
+        return max(self._min_rate, min(self._max_rate, rate))
+
+
+    def _seconds_to_reset(self, headers: dict) -> float:
+        if self._reset_header in headers:
+            reset = float(headers[self._reset_header])
+            if reset > 1e9:
+                reset -= time.time()  # Unix timestamp
+            return max(reset, 1.0)
+        return self._window
+
+
+    def update(self, headers: dict) -> float:
+        # Returns new rate or None when headers do not carry quota information
+        if headers is None or self._remaining_header not in headers:
+            return None
+        try:
+            remaining = float(headers[self._remaining_header])
+            rate = self._clamp(self._safety * remaining / self._seconds_to_reset(headers))
+        except (TypeError, ValueError):
+            return None
+        self._limiter.set_rate(rate)
+        return rate
+
+
+    def throttled(self) -> float:
+        # Provider rejected request, halve the rate
+        rate = self._clamp(self._limiter.rate / 2)
+        self._limiter.set_rate(rate)
+        return rate
+
+
+def get_adaptive_rate(data_src: str, limiter: TokenBucket) -> AdaptiveRate:
+    ac = api_config[data_src]
+    if not ac['adaptive_rate']:
+        return None
+    return AdaptiveRate(
+        limiter, ac['requests_per_second_min'], ac['requests_per_second_max'],
+        ac['rate_remaining_header'], ac['rate_reset_header'], ac['rate_window'])
+
+
+def get_rate_limiter(data_src: str) -> TokenBucket:
+    '''Create rate limiter backend selected in `api_config[data_src]['rate_limiter']`
+
+    thread - limiter shared by threads of one process
+    file - limiter shared by all processes on one host
+    '''
+    ac = api_config[data_src]
+    backend = ac['rate_limiter']
+    if backend == 'thread':
+        return TokenBucket(ac['requests_per_second'], ac['requests_burst'])
+    elif backend == 'file':
+        file_path = os.path.normpath(os.path.join(
+            app_config['path_storage'], 'tmp', '{}_rate_limiter.bin'.format(data_src)))
+        return FileTokenBucket(ac['requests_per_second'], ac['requests_burst'], file_path)
+    raise ValueError('Unknown rate limiter backend "{}" for API "{}"'.format(backend, data_src))
@@ -0,0 +1,101 @@
+# -*- coding: UTF-8 -*-
+
+import os
+import gzip
+import json
+import hashlib
+import uuid
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from config.settings import app_config
+
+
+class ResponseNotRecorded(Exception):
+    pass
+
+
+class ResponseStore(object):
+    '''Content-addressed on-disk store of provider responses
+
+    <path_storage>/responses/objects/ab/<sha256 of body>.gz - gzipped bodies, identical bodies are stored once
+    <path_storage>/responses/<data_src>/<sha256 of request>.json - endpoint, status, headers and body hash
+
+    Requests are keyed by API endpoint and request data, never by full URL, so credentials are not stored.
+    '''
+
+    def __init__(self, data_src: str, base_path: str = None):
+        if base_path is None:
+            base_path = os.path.join(app_config['path_storage'], 'responses')
+        self._data_src = data_src
+        self._objects_path = os.path.join(base_path, 'objects')
+        self._requests_path = os.path.join(base_path, data_src)
+
+
+    def _request_key(self, api_endpoint: str, data: dict) -> str:
+        request = json.dumps([api_endpoint, data], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(request.encode('utf-8')).hexdigest()
+
+
+    def _object_path(self, body_hash: str) -> str:
+        return os.path.join(self._objects_path, body_hash[:2], '{}.gz'.format(body_hash))
+
+
+    def _write_atomic(self, file_path: str, content: bytes) -> None:
+        # Write into temporary file first, so concurrent readers never see partial files
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        tmp_file_path = '{}.{}.tmp'.format(file_path, uuid.uuid4().hex)
+        with open(tmp_file_path, 'wb') as fh:
+            fh.write(content)
+        os.replace(tmp_file_path, file_path)
+
+
+    def save(self, api_endpoint: str, data: dict, status_code: int, headers: dict, body: bytes) -> str:
+        body_hash = hashlib.sha256(body).hexdigest()
+        object_path = self._object_path(body_hash)
+        if not os.path.exists(object_path):
+            self._write_atomic(object_path, gzip.compress(body))
+
+        request_key = self._request_key(api_endpoint, data)
+        meta = {
+            'api_endpoint': api_endpoint,
+            'data': data,
+            'status_code': status_code,
+            # Body is stored decoded, transfer headers would not match it
+            'headers': {k: v for k, v in headers.items() if k.lower() not in ['content-encoding', 'content-length']},
+            'body_hash': body_hash
+        }
+        self._write_atomic(
+            os.path.join(self._requests_path, '{}.json'.format(request_key)),
+            json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+        return request_key
+
+
+    def load(self, api_endpoint: str, data: dict) -> tuple:
+        # Returns (status_code, headers, body)
+        request_key = self._request_key(api_endpoint, data)
+        meta_path = os.path.join(self._requests_path, '{}.json'.format(request_key))
+        if not os.path.exists(meta_path):
+            raise ResponseNotRecorded('Response of "{}" was not recorded for {}'.format(api_endpoint, self._data_src))
+        with open(meta_path, 'rb') as fh:
+            meta = json.loads(fh.read().decode('utf-8'))
+        with open(self._object_path(meta['body_hash']), 'rb') as fh:
+            body = gzip.decompress(fh.read())
+        return meta['status_code'], CaseInsensitiveDict(meta['headers']), body
+
+
+    def save_response(self, api_endpoint: str, data: dict, response: requests.Response) -> str:
+        return self.save(api_endpoint, data, response.status_code, response.headers, response.content)
+
+
+    def load_response(self, api_endpoint: str, data: dict, url: str = None) -> requests.Response:
+        # Recorded response wrapped as `requests.Response`, so callers handle it as a live one
+        status_code, headers, body = self.load(api_endpoint, data)
+        response = requests.Response()
+        response.status_code = status_code
+        response.headers = headers
+        response._content = body
+        response.url = url
+        response.encoding = 'utf-8'
+        return response
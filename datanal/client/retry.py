@@ -0,0 +1,95 @@
+# -*- coding: UTF-8 -*-
+
+import time
+import random
+import email.utils
+
+from datanal.config.api_settings import api_config
+
+
+class RetriesExhausted(Exception):
+    pass
+
+
+class RetryPolicy(object):
+    '''Retry of failed provider requests with exponential backoff and jitter
+
+    Delay is `backoff * 2 ** attempt` with random jitter, capped by `backoff_max`. What provider asks for
+    (`Retry-After`, rate limit reset headers of 429 responses) is its lower bound, capped by `retry_after_max`.
+    '''
+    retry_statuses = (429, 500, 502, 503, 504)
+    reset_headers = ('X-Rate-Limit-Reset', 'X-RateLimit-Reset')
+
+    def __init__(
+            self, max_retries: int = 3, backoff: float = 0.5, backoff_max: float = 30, jitter: float = 0.5,
+            retry_after_max: float = 300):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.retry_after_max = retry_after_max
+
+
+    def should_retry(self, attempt: int, status_code: int = None) -> bool:
+        # Status code None means connection error
+        if attempt >= self.max_retries:
+            return False
+        return status_code is None or status_code in self.retry_statuses
+
+
+    def check_exhausted(self, attempt: int, status_code: int, reason: str = '') -> None:
+        # Do not hand over 429 and 5xx responses (mostly not JSON) when retries did not help
+        if status_code in self.retry_statuses:
+            raise RetriesExhausted('HTTP {} {} (retried {}x)'.format(status_code, reason, attempt))
+
+
+    def is_throttled(self, status_code: int, headers: dict = None) -> bool:
+        # Provider asks to slow down all requests, not only this one
+        return status_code == 429 or (headers is not None and 'Retry-After' in headers)
+
+
+    def _parse_retry_after(self, value: str) -> float:
+        # Retry-After is either delay in seconds or HTTP date
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            date = email.utils.parsedate_to_datetime(value)
+            return max(0.0, date.timestamp() - time.time())
+
+
+    def _parse_reset(self, value: str) -> float:
+        # Reset is either Unix timestamp or seconds to reset
+        reset = float(value)
+        if reset > 1e9:
+            reset -= time.time()
+        return max(0.0, reset)
+
+
+    def _get_asked_delay(self, headers: dict, status_code: int) -> float:
+        # Delay provider asks for or None
+        try:
+            if 'Retry-After' in headers:
+                return self._parse_retry_after(headers['Retry-After'])
+            # Quota reset says nothing about server errors, 5xx responses use backoff
+            for name in (self.reset_headers if status_code == 429 else ()):
+                if name in headers:
+                    return self._parse_reset(headers[name])
+        except (TypeError, ValueError):
+            pass  # Malformed header, use backoff
+        return None
+
+
+    def get_delay(self, attempt: int, headers: dict = None, status_code: int = None) -> float:
+        delay = self.backoff * (2 ** attempt)
+        delay = min(delay + delay * self.jitter * random.random(), self.backoff_max)
+        asked = self._get_asked_delay(headers, status_code) if headers is not None else None
+        if asked is not None:
+            # Earlier retry would be throttled again
+            delay = min(max(asked, delay), self.retry_after_max)
+        return delay
+
+
+def get_retry_policy(data_src: str) -> RetryPolicy:
+    ac = api_config[data_src]
+    return RetryPolicy(
+        ac['max_retries'], ac['retry_backoff'], ac['retry_backoff_max'], retry_after_max=ac['retry_after_max'])
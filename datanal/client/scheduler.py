@@ -0,0 +1,97 @@
+# -*- coding: UTF-8 -*-
+
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+from datanal.client.ratelimiter import TokenBucket
+
+
+# Job types by priority, live stats of finished games are the most urgent
+JOB_TYPES = ['collect', 'watch', 'grab']
+DEFAULT_JOB_TYPE = 'watch'
+
+_context = threading.local()
+
+
+@contextmanager
+def request_context(job_type: str, game: str = None):
+    # Requests sent by the current thread inside the block are scheduled as `job_type` of `game`
+    previous = get_request_context()
+    _context.value = (job_type, game)
+    try:
+        yield
+    finally:
+        _context.value = previous
+
+
+def get_request_context() -> tuple:
+    return getattr(_context, 'value', (DEFAULT_JOB_TYPE, None))
+
+
+class RequestScheduler(object):
+    '''Hand out rate limiter tokens by priority of job types
+
+    Waiting requests are queued by job type (collect > watch > grab) and inside of one job type
+    by game, games take turns, so one long job does not block the others. Only the request at the head
+    waits for the limiter, the next one is picked when it gets its token, so a request of higher priority
+    waits for one token at most. Priorities apply inside of one process.
+    '''
+
+    def __init__(self, limiter: TokenBucket):
+        self._limiter = limiter
+        self._cond = threading.Condition()
+        self._queues = OrderedDict((job_type, OrderedDict()) for job_type in JOB_TYPES)  # game -> tickets
+        self._busy = False
+        self._granted = {job_type: 0 for job_type in JOB_TYPES}
+
+
+    def _head(self) -> object:
+        # Caller has to hold the lock
+        for games in self._queues.values():
+            if games:
+                return next(iter(games.values()))[0]
+        return None
+
+
+    def _pop_head(self) -> None:
+        # Caller has to hold the lock, game of the head goes to the end of its job type queue
+        for job_type, games in self._queues.items():
+            if games:
+                game, tickets = next(iter(games.items()))
+                tickets.popleft()
+                if tickets:
+                    games.move_to_end(game)
+                else:
+                    del games[game]
+                self._granted[job_type] += 1
+                return
+
+
+    def acquire(self, job_type: str = None, game: str = None) -> bool:
+        if job_type not in self._queues:
+            job_type = DEFAULT_JOB_TYPE
+        ticket = object()
+        with self._cond:
+            self._queues[job_type].setdefault(game, deque()).append(ticket)
+            while self._busy or self._head() is not ticket:
+                self._cond.wait()
+            self._pop_head()
+            self._busy = True
+        try:
+            return self._limiter.acquire()
+        finally:
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                'queued': {
+                    job_type: sum(len(tickets) for tickets in games.values())
+                    for job_type, games in self._queues.items()},
+                'queued_games': {job_type: len(games) for job_type, games in self._queues.items()},
+                'granted': dict(self._granted)
+            }
@@ -0,0 +1,74 @@
+# -*- coding: UTF-8 -*-
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class SessionPool(object):
+    '''Keep-alive HTTP sessions of one provider
+
+    Every thread gets its own `requests.Session` (sessions are not guaranteed to be thread-safe),
+    but all of them are mounted to one `HTTPAdapter`, so TCP+TLS connections are pooled and reused
+    across threads and requests.
+    '''
+    default_headers = {
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive'
+    }
+
+    def __init__(self, pool_size: int = 10):
+        self._pool_size = pool_size
+        self._adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sessions_count = 0
+        self._requests_count = 0
+
+
+    @property
+    def session(self) -> requests.Session:
+        if not hasattr(self._local, 'session'):
+            session = requests.Session()
+            session.headers.update(self.default_headers)
+            session.mount('http://', self._adapter)
+            session.mount('https://', self._adapter)
+            self._local.session = session
+            with self._lock:
+                self._sessions_count += 1
+        return self._local.session
+
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        with self._lock:
+            self._requests_count += 1
+        return self.session.request(method, url, **kwargs)
+
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+
+    def stats(self) -> dict:
+        hosts = {}
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            hosts['{}://{}:{}'.format(pool.scheme, pool.host, pool.port)] = {
+                'connections_opened': pool.num_connections,
+                'connections_idle': len([x for x in pool.pool.queue if x is not None]) if pool.pool else 0,
+                'requests': pool.num_requests
+            }
+        return {
+            'pool_size': self._pool_size,
+            'sessions': self._sessions_count,
+            'requests': self._requests_count,
+            'hosts': hosts
+        }
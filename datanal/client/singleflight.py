@@ -0,0 +1,105 @@
+# -*- coding: UTF-8 -*-
+
+import time
+import threading
+from collections import OrderedDict
+
+
+class _Call(object):
+    '''One in-flight call, followers wait for its result'''
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    '''Coalesce concurrent calls with the same key into one call
+
+    The first caller (leader) runs the function, callers with the same key arriving meanwhile wait
+    and get the same result (or exception). With `ttl` > 0 successful results are kept for `ttl` seconds,
+    so back-to-back calls reuse them too. Results are shared objects, callers must not modify them.
+    '''
+
+    def __init__(self, ttl: float = 0, max_size: int = 1000):
+        self._ttl = ttl
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._cache = OrderedDict()
+        self._stats = {'calls': 0, 'shared': 0, 'cached': 0}
+
+
+    def _get_cached(self, key: tuple) -> tuple:
+        # Caller has to hold the lock, returns (found, result)
+        if key in self._cache:
+            expire, result = self._cache[key]
+            if expire > time.monotonic():
+                self._stats['cached'] += 1
+                return True, result
+            del self._cache[key]
+        return False, None
+
+
+    def _set_cached(self, key: tuple, result: object) -> None:
+        # Caller has to hold the lock
+        if self._ttl <= 0:
+            return
+        self._cache[key] = (time.monotonic() + self._ttl, result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._max_size:
+            self._cache.popitem(last=False)
+
+
+    def get(self, key: tuple) -> object:
+        # Non-blocking cache lookup, returns None when there is no fresh result
+        with self._lock:
+            return self._get_cached(key)[1]
+
+
+    def set(self, key: tuple, result: object) -> None:
+        with self._lock:
+            self._set_cached(key, result)
+
+
+    def do(self, key: tuple, fn: callable) -> object:
+        with self._lock:
+            found, result = self._get_cached(key)
+            if found:
+                return result
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats['calls'] += 1
+            else:
+                self._stats['shared'] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                if call.error is None:
+                    self._set_cached(key, call.result)
+            call.event.set()
+        return call.result
+
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._calls)
+            stats['cache_size'] = len(self._cache)
+            stats['ttl'] = self._ttl
+        return stats
@@ -0,0 +1,69 @@
+# -*- coding: UTF-8 -*-
+
+import requests
+try:
+    import ijson
+except ImportError:  # Optional package, whole response is decoded without it
+    ijson = None
+
+from datanal.tools import from_json
+
+
+_scalar_events = ('null', 'boolean', 'integer', 'double', 'number', 'string')
+
+
+def iter_document_items(document: (dict, list), prefix: str, meta: dict) -> iter:
+    '''Yield items of decoded document at ijson `prefix` (e.g. "data.item" or "item")
+
+    Top-level scalars of the document are saved into `meta`, keys of top-level containers are saved with None.
+    '''
+    if isinstance(document, dict):
+        for key, value in document.items():
+            meta[key] = None if isinstance(value, (dict, list)) else value
+    node = document
+    for key in prefix.split('.'):
+        if key == 'item':
+            break
+        node = node.get(key, []) if isinstance(node, dict) else []
+    if isinstance(node, list):
+        yield from node
+
+
+def iter_stream_items(fh: object, prefix: str, meta: dict) -> iter:
+    # Same as `iter_document_items`, but items are built from parser events while `fh` is being read
+    builder = None
+    for path, event, value in ijson.parse(fh, use_float=True):
+        if builder is not None:
+            if path == prefix and event in ('end_map', 'end_array'):
+                builder.event(event, value)
+                yield builder.value
+                builder = None
+            else:
+                builder.event(event, value)
+        elif path == prefix:
+            if event in ('start_map', 'start_array'):
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+            else:
+                yield value
+        elif '.' not in path and path:
+            if event in _scalar_events:
+                meta[path] = value
+            elif event in ('start_map', 'start_array'):
+                meta.setdefault(path, None)
+
+
+def iter_response_items(response: requests.Response, prefix: str, meta: dict) -> iter:
+    '''Yield items at `prefix` of JSON response body one by one
+
+    Body of streamed response (`stream=True`) is parsed while it is downloading, when ijson is installed,
+    so only one item is kept in memory. Read responses (recorded, replayed) are decoded at once.
+    '''
+    if ijson is None or response.raw is None or response._content_consumed:
+        yield from iter_document_items(from_json(response.content), prefix, meta)
+        return
+    response.raw.decode_content = True  # gzip is decoded by urllib3
+    try:
+        yield from iter_stream_items(response.raw, prefix, meta)
+    finally:
+        response.close()
@@ -0,0 +1,11 @@
+# -*- coding: UTF-8 -*-
+# flake8: noqa: E303, W503
+
+import os
+import sys
+
+instance_dirpath = '{}{}'.format(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'), os.sep)
+sys.path.append(instance_dirpath)
+
+from lib import tools  # noqa (imported before lib.libpool, they import each other)
@@ -0,0 +1,75 @@
+# -*- coding: UTF-8 -*-
+# flake8: noqa: E303, W503
+
+import time
+import random
+import threading
+
+import pytest
+
+from datanal.client.fetcher import FetchIterator
+from datanal.client.scheduler import request_context, get_request_context
+
+
+def fetch(item: int) -> int:
+    # Items are done in random order, multiples of 3 fail
+    time.sleep(random.random() / 100)
+    if item % 3 == 0:
+        raise ValueError(item)
+    return item * 10
+
+
+@pytest.mark.parametrize('max_workers', [1, 4])
+class TestFetchIterator(object):
+
+    def test_results_in_order_of_items(self, max_workers):
+        results = [(item, result) for item, result, error in FetchIterator(fetch, [1, 2, 4, 5, 7], max_workers)]
+        assert results == [(1, 10), (2, 20), (4, 40), (5, 50), (7, 70)]
+
+
+    def test_error_is_isolated_to_its_item(self, max_workers):
+        fetched = list(FetchIterator(fetch, list(range(1, 11)), max_workers))
+        assert [item for item, result, error in fetched] == list(range(1, 11))
+        for item, result, error in fetched:
+            if item % 3 == 0:
+                assert result is None and isinstance(error, ValueError) and error.args == (item,)
+            else:
+                assert result == item * 10 and error is None
+
+
+    def test_request_context(self, max_workers):
+        with request_context('collect', 'csgo'):
+            contexts = [result for item, result, error in FetchIterator(
+                lambda item: get_request_context(), [1, 2, 3], max_workers)]
+        assert contexts == [('collect', 'csgo')] * 3
+
+
+    def test_no_items(self, max_workers):
+        assert list(FetchIterator(fetch, [], max_workers)) == []
+
+
+class TestBoundedFetch(object):
+
+    def test_concurrency_is_bounded(self):
+        lock = threading.Lock()
+        running = [0, 0]  # now, max
+
+        def tracked(item: int) -> int:
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            return item
+
+        assert [item for item, result, error in FetchIterator(tracked, list(range(20)), 3)] == list(range(20))
+        assert 1 < running[1] <= 3
+
+
+    def test_results_wait_for_consumer(self):
+        started = []
+        fetched = iter(FetchIterator(lambda item: started.append(item), list(range(20)), 2))
+        next(fetched)
+        time.sleep(0.05)
+        assert len(started) <= 5
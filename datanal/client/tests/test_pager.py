@@ -0,0 +1,87 @@
+# -*- coding: UTF-8 -*-
+# flake8: noqa: E303, W503
+
+import time
+import threading
+
+import pytest
+
+from datanal.client.pager import PageIterator
+from datanal.client.scheduler import request_context, get_request_context
+
+
+class Listing(object):
+    '''Fake provider listing of `last_page` pages, records fetched pages and request context of each'''
+
+    def __init__(self, last_page: int):
+        self.last_page = last_page
+        self.fetched = []
+        self.contexts = []
+
+
+    def fetch(self, page: int) -> tuple:
+        self.fetched.append(page)
+        self.contexts.append(get_request_context())
+        return {'X-Last-Page': self.last_page}, ['page {}'.format(page)]
+
+
+    def get_last_page(self, headers: dict, data: list) -> int:
+        return headers['X-Last-Page']
+
+
+@pytest.mark.parametrize('prefetch', [True, False])
+class TestPageIterator(object):
+
+    def test_all_pages(self, prefetch):
+        listing = Listing(3)
+        pages = list(PageIterator(listing.fetch, listing.get_last_page, prefetch=prefetch))
+        assert pages == [(page, {'X-Last-Page': 3}, ['page {}'.format(page)]) for page in (1, 2, 3)]
+        assert listing.fetched == [1, 2, 3]
+
+
+    def test_first_page(self, prefetch):
+        listing = Listing(3)
+        pages = PageIterator(listing.fetch, listing.get_last_page, prefetch=prefetch, first_page=2)
+        assert [page for page, headers, data in pages] == [2, 3]
+
+
+    def test_stop(self, prefetch):
+        listing = Listing(5)
+        pages = PageIterator(
+            listing.fetch, listing.get_last_page, stop=lambda headers, data: data == ['page 2'], prefetch=prefetch)
+        assert [page for page, headers, data in pages] == [1, 2]
+        assert listing.fetched == [1, 2]
+
+
+    def test_request_context(self, prefetch):
+        listing = Listing(3)
+        with request_context('grab', 'lol'):
+            list(PageIterator(listing.fetch, listing.get_last_page, prefetch=prefetch))
+        assert listing.contexts == [('grab', 'lol')] * 3
+
+
+class TestPrefetch(object):
+
+    def test_next_page_is_fetched_while_current_is_processed(self):
+        listing = Listing(2)
+        fetched = threading.Event()
+
+        def fetch(page: int) -> tuple:
+            result = listing.fetch(page)
+            if page == 2:
+                fetched.set()
+            return result
+
+        pages = iter(PageIterator(fetch, listing.get_last_page))
+        assert next(pages)[0] == 1
+        assert fetched.wait(5)
+        assert next(pages)[0] == 2
+
+
+    def test_abandoned_iteration(self):
+        listing = Listing(10)
+        for page, headers, data in PageIterator(listing.fetch, listing.get_last_page):
+            if page == 2:
+                break
+        time.sleep(0.05)
+        assert listing.fetched == [1, 2, 3]
@@ -0,0 +1,58 @@
+# -*- coding: UTF-8 -*-
+# flake8: noqa: E303, W503
+
+import time
+import threading
+
+import pytest
+import cherrypy
+
+from datanal.client.provider1 import RestClient as Provider1Client
+from datanal.client.provider2 import RestClient as Provider2Client
+
+
+def load_request(start: float) -> None:
+    # Own request object of the calling thread, as CherryPy sets it for each served request
+    request = cherrypy._cprequest.Request(None, None)
+    request._start = start
+    cherrypy.serving.load(request, cherrypy._cprequest.Response())
+
+
+@pytest.mark.parametrize('client_class, pool_name', [
+    (Provider1Client, '_abiospool'), (Provider2Client, '_pandapool')])
+class TestSendRequest(object):
+
+    def test_leader_timeout_is_not_shared(self, client_class, pool_name):
+        singleflight = getattr(client_class, pool_name).singleflight
+        client = client_class.__new__(client_class)
+
+        def send(api_endpoint, data):
+            # Leader waits until the follower joins the call
+            while singleflight.stats()['shared'] < shared_before + 1:
+                time.sleep(0.01)
+            return {}, {'data': api_endpoint}
+        client._send_request = send
+        shared_before = singleflight.stats()['shared']
+
+        results = {}
+
+        def leader():
+            load_request(time.perf_counter() - 10 ** 6)  # Time limit of the request is over
+            try:
+                results['leader'] = client.send_request('timeout-test')
+            except cherrypy.HTTPError as e:
+                results['leader'] = e.status
+
+        def follower():
+            load_request(time.perf_counter())
+            results['follower'] = client.send_request('timeout-test')
+
+        threads = [threading.Thread(target=leader)]
+        threads[0].start()
+        while singleflight.stats()['in_flight'] == 0:
+            time.sleep(0.01)
+        threads.append(threading.Thread(target=follower))
+        threads[1].start()
+        for thread in threads:
+            thread.join(5)
+        assert results == {'leader': 408, 'follower': ({}, {'data': 'timeout-test'})}
@@ -0,0 +1,148 @@
+# -*- coding: UTF-8 -*-
+# flake8: noqa: E303, W503
+
+import os
+import time
+import multiprocessing
+
+import pytest
+
+from datanal.client.ratelimiter import TokenBucket, FileTokenBucket, AdaptiveRate
+
+
+def acquire_from_file(file_path: str, rate: float, count: int) -> None:
+    # Worker process takes tokens from the bucket shared by the file
+    limiter = FileTokenBucket(rate, 1, file_path)
+    for i in range(count):
+        limiter.acquire()
+
+
+class TestTokenBucket(object):
+
+    def test_rate_must_be_positive(self):
+        with pytest.raises(ValueError):
+            TokenBucket(0)
+
+
+    def test_burst_up_to_capacity(self):
+        limiter = TokenBucket(1, 3)
+        assert [limiter.try_acquire() for i in range(4)] == [True, True, True, False]
+
+
+    def test_rate(self):
+        # First token is in the full bucket, the other 5 come at 20 per second
+        limiter = TokenBucket(20)
+        start = time.monotonic()
+        for i in range(6):
+            limiter.acquire()
+        assert 0.24 <= time.monotonic() - start < 0.5
+
+
+    def test_reservations_are_queued(self):
+        limiter = TokenBucket(10)
+        assert limiter.reserve() == 0
+        assert limiter.reserve() == pytest.approx(0.1, abs=0.01)
+        assert limiter.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+    def test_pause(self):
+        limiter = TokenBucket(10, 5)
+        limiter.pause(0.5)
+        assert limiter.reserve() == pytest.approx(0.5, abs=0.01)
+
+
+    def test_pause_does_not_shorten_wait(self):
+        limiter = TokenBucket(10)
+        limiter.pause(1)
+        limiter.pause(0.2)
+        assert limiter.reserve() == pytest.approx(1, abs=0.01)
+
+
+    def test_set_rate(self):
+        limiter = TokenBucket(10)
+        limiter.acquire()
+        limiter.set_rate(2)
+        assert limiter.rate == 2
+        assert limiter.reserve() == pytest.approx(0.5, abs=0.01)
+
+
+class TestFileTokenBucket(object):
+
+    def test_creates_state_directory(self, tmp_path):
+        file_path = str(tmp_path / 'tmp' / 'limiter.bin')
+        limiter = FileTokenBucket(10, 1, file_path)
+        assert os.path.getsize(file_path) == limiter._state_size
+        assert limiter.stats()['file_path'] == file_path
+
+
+    def test_state_is_shared(self, tmp_path):
+        file_path = str(tmp_path / 'limiter.bin')
+        first = FileTokenBucket(1, 2, file_path)
+        second = FileTokenBucket(1, 2, file_path)
+        assert first.try_acquire() and second.try_acquire()
+        assert not first.try_acquire()
+        assert not second.try_acquire()
+
+
+    def test_lowered_capacity(self, tmp_path):
+        file_path = str(tmp_path / 'limiter.bin')
+        FileTokenBucket(1, 5, file_path)
+        limiter = FileTokenBucket(1, 2, file_path)
+        assert [limiter.try_acquire() for i in range(3)] == [True, True, False]
+
+
+    def test_rate_across_processes(self, tmp_path):
+        # 3 processes take 4 tokens each, the first one is in the full bucket, the other 11 come at 20 per second
+        file_path = str(tmp_path / 'limiter.bin')
+        FileTokenBucket(20, 1, file_path)
+        context = multiprocessing.get_context('fork')
+        processes = [context.Process(target=acquire_from_file, args=(file_path, 20, 4)) for i in range(3)]
+        start = time.monotonic()
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(10)
+        assert [process.exitcode for process in processes] == [0, 0, 0]
+        assert time.monotonic() - start >= 0.55
+
+
+class TestAdaptiveRate(object):
+
+    def get_adaptive(self, limiter: TokenBucket) -> AdaptiveRate:
+        return AdaptiveRate(limiter, 0.5, 10, 'X-Remaining', 'X-Reset', 60)
+
+
+    def test_remaining_quota_is_spread_to_reset(self):
+        limiter = TokenBucket(1)
+        assert self.get_adaptive(limiter).update({'X-Remaining': '100', 'X-Reset': '30'}) == pytest.approx(3)
+        assert limiter.rate == pytest.approx(3)
+
+
+    def test_window_without_reset(self):
+        limiter = TokenBucket(1)
+        assert self.get_adaptive(limiter).update({'X-Remaining': '200'}) == pytest.approx(3)
+
+
+    def test_rate_is_clamped(self):
+        limiter = TokenBucket(1)
+        adaptive = self.get_adaptive(limiter)
+        assert adaptive.update({'X-Remaining': '10000', 'X-Reset': '1'}) == 10
+        assert adaptive.update({'X-Remaining': '0', 'X-Reset': '1'}) == 0.5
+
+
+    def test_headers_without_quota(self):
+        limiter = TokenBucket(1)
+        adaptive = self.get_adaptive(limiter)
+        assert adaptive.update(None) is None
+        assert adaptive.update({}) is None
+        assert adaptive.update({'X-Remaining': 'many'}) is None
+        assert limiter.rate == 1
+
+
+    def test_throttled(self):
+        limiter = TokenBucket(4)
+        adaptive = self.get_adaptive(limiter)
+        assert adaptive.throttled() == 2
+        assert adaptive.throttled() == 1
+        assert adaptive.throttled() == 0.5
+        assert adaptive.throttled() == 0.5
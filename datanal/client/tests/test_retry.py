@@ -0,0 +1,88 @@
+# -*- coding: UTF-8 -*-
+# flake8: noqa: E303, W503
+
+import time
+import email.utils
+
+import pytest
+
+from datanal.client.retry import RetryPolicy, RetriesExhausted
+
+
+class TestRetryPolicy(object):
+
+    def get_policy(self, **kwargs) -> RetryPolicy:
+        # Without jitter the backoff is 0.5, 1, 2, 4, ...
+        kwargs.setdefault('jitter', 0)
+        return RetryPolicy(**kwargs)
+
+
+    def test_should_retry(self):
+        policy = self.get_policy(max_retries=2)
+        assert policy.should_retry(0, None)
+        assert policy.should_retry(1, 503)
+        assert not policy.should_retry(0, 404)
+        assert not policy.should_retry(2, 503)
+
+
+    def test_check_exhausted(self):
+        policy = self.get_policy()
+        policy.check_exhausted(3, 404)
+        with pytest.raises(RetriesExhausted):
+            policy.check_exhausted(3, 429, 'Too Many Requests')
+
+
+    def test_backoff(self):
+        policy = self.get_policy(backoff_max=3)
+        assert [policy.get_delay(attempt) for attempt in range(4)] == [0.5, 1, 2, 3]
+
+
+    def test_jitter(self):
+        policy = RetryPolicy(backoff=1, jitter=0.5)
+        for i in range(20):
+            assert 2 <= policy.get_delay(1) <= 3
+
+
+    def test_retry_after_above_backoff(self):
+        policy = self.get_policy()
+        assert policy.get_delay(0, {'Retry-After': '10'}, 429) == 10
+
+
+    def test_retry_after_below_backoff(self):
+        # Provider delay is the lower bound, backoff still grows
+        policy = self.get_policy()
+        assert policy.get_delay(3, {'Retry-After': '1'}, 503) == 4
+
+
+    def test_retry_after_is_capped(self):
+        policy = self.get_policy(retry_after_max=60)
+        assert policy.get_delay(0, {'Retry-After': '3600'}, 429) == 60
+
+
+    def test_retry_after_date(self):
+        policy = self.get_policy()
+        value = email.utils.formatdate(time.time() + 20, usegmt=True)
+        assert policy.get_delay(0, {'Retry-After': value}, 429) == pytest.approx(20, abs=1.5)
+
+
+    def test_reset_header_of_throttled_response(self):
+        policy = self.get_policy()
+        assert policy.get_delay(0, {'X-Rate-Limit-Reset': '15'}, 429) == 15
+        assert policy.get_delay(0, {'X-RateLimit-Reset': str(int(time.time()) + 15)}, 429) == pytest.approx(15, abs=1.5)
+
+
+    def test_reset_header_of_server_error(self):
+        policy = self.get_policy()
+        assert policy.get_delay(1, {'X-Rate-Limit-Reset': '15'}, 503) == 1
+
+
+    def test_malformed_header(self):
+        policy = self.get_policy()
+        assert policy.get_delay(1, {'Retry-After': 'soon'}, 429) == 1
+
+
+    def test_is_throttled(self):
+        policy = self.get_policy()
+        assert policy.is_throttled(429)
+        assert policy.is_throttled(503, {'Retry-After': '1'})
+        assert not policy.is_throttled(503, {})
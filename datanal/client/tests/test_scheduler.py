@@ -0,0 +1,83 @@
+# -*- coding: UTF-8 -*-
+# flake8: noqa: E303, W503
+
+import time
+import threading
+
+from datanal.client.scheduler import RequestScheduler, request_context, get_request_context, DEFAULT_JOB_TYPE
+
+
+class BlockingLimiter(object):
+    '''Limiter recording names of threads it let through, the first one waits for `release`'''
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.order = []
+
+
+    def acquire(self) -> bool:
+        self.order.append(threading.current_thread().name)
+        if len(self.order) == 1:
+            self.release.wait(5)
+        return True
+
+
+def wait_until(condition: callable) -> None:
+    deadline = time.monotonic() + 5
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def run_queued(scheduler: RequestScheduler, limiter: BlockingLimiter, requests: list) -> list:
+    # First request holds the limiter while the others are queued one by one, returns order they got tokens
+    threads = []
+    for i, (name, job_type, game) in enumerate(requests):
+        thread = threading.Thread(target=scheduler.acquire, args=(job_type, game), name=name)
+        thread.start()
+        threads.append(thread)
+        if i == 0:
+            wait_until(lambda: limiter.order)
+        else:
+            wait_until(lambda: sum(scheduler.stats()['queued'].values()) == i)
+    limiter.release.set()
+    for thread in threads:
+        thread.join(5)
+    return limiter.order
+
+
+class TestRequestScheduler(object):
+
+    def test_priority_of_job_types(self):
+        limiter = BlockingLimiter()
+        scheduler = RequestScheduler(limiter)
+        order = run_queued(scheduler, limiter, [
+            ('first', 'grab', 'lol'), ('grab', 'grab', 'lol'), ('watch', 'watch', 'lol'),
+            ('collect', 'collect', 'lol')])
+        assert order == ['first', 'collect', 'watch', 'grab']
+        assert scheduler.stats()['granted'] == {'collect': 1, 'watch': 1, 'grab': 2}
+
+
+    def test_games_take_turns(self):
+        limiter = BlockingLimiter()
+        scheduler = RequestScheduler(limiter)
+        order = run_queued(scheduler, limiter, [
+            ('first', 'watch', 'lol'), ('lol1', 'watch', 'lol'), ('lol2', 'watch', 'lol'),
+            ('csgo1', 'watch', 'csgo')])
+        assert order == ['first', 'lol1', 'csgo1', 'lol2']
+
+
+    def test_unknown_job_type(self):
+        limiter = BlockingLimiter()
+        limiter.release.set()
+        scheduler = RequestScheduler(limiter)
+        assert scheduler.acquire('unknown')
+        assert scheduler.stats()['granted'][DEFAULT_JOB_TYPE] == 1
+
+
+    def test_request_context(self):
+        assert get_request_context() == (DEFAULT_JOB_TYPE, None)
+        with request_context('grab', 'lol'):
+            with request_context('collect'):
+                assert get_request_context() == ('collect', None)
+            assert get_request_context() == ('grab', 'lol')
+        assert get_request_context() == (DEFAULT_JOB_TYPE, None)
@@ -0,0 +1,62 @@
+# -*- coding: UTF-8 -*-
+# flake8: noqa: E303, W503
+
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+from datanal.client.session import SessionPool
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'{"data": []}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = HTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield 'http://127.0.0.1:{}'.format(server.server_port)
+    server.shutdown()
+    server.server_close()
+    thread.join(5)
+
+
+class TestSessionPool(object):
+
+    def test_session_per_thread(self):
+        pool = SessionPool()
+        sessions = []
+        thread = threading.Thread(target=lambda: sessions.append(pool.session))
+        thread.start()
+        thread.join(5)
+        assert pool.session is pool.session
+        assert sessions[0] is not pool.session
+        assert sessions[0].get_adapter('https://') is pool.session.get_adapter('https://')
+        assert pool.session.headers['Connection'] == 'keep-alive'
+        assert pool.stats()['sessions'] == 2
+
+
+    def test_connection_is_reused(self, server_url):
+        pool = SessionPool()
+        for i in range(3):
+            response = pool.get('{}/items'.format(server_url))
+            assert response.json() == {'data': []}
+        stats = pool.stats()
+        assert stats['requests'] == 3
+        host = stats['hosts']['http://127.0.0.1:{}'.format(server_url.rsplit(':', 1)[1])]
+        assert host == {'connections_opened': 1, 'connections_idle': 1, 'requests': 3}
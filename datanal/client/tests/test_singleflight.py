@@ -0,0 +1,96 @@
+# -*- coding: UTF-8 -*-
+# flake8: noqa: E303, W503
+
+import time
+import threading
+
+from datanal.client.singleflight import SingleFlight
+
+
+def wait_until(condition: callable) -> None:
+    deadline = time.monotonic() + 5
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def run_coalesced(singleflight: SingleFlight, fn: callable, callers: int) -> list:
+    # Leader runs `fn` until all followers joined its call, returns results (or exceptions) of all callers
+    release = threading.Event()
+    results = [None] * callers
+
+    def leader_fn():
+        release.wait(5)
+        return fn()
+
+    def call(i: int):
+        try:
+            results[i] = singleflight.do(('key',), leader_fn)
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+    threads[0].start()
+    wait_until(lambda: singleflight.stats()['in_flight'] == 1)
+    for thread in threads[1:]:
+        thread.start()
+    wait_until(lambda: singleflight.stats()['shared'] == callers - 1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    return results
+
+
+class TestSingleFlight(object):
+
+    def test_calls_are_coalesced(self):
+        singleflight = SingleFlight()
+        calls = []
+        results = run_coalesced(singleflight, lambda: calls.append(1) or {'data': 1}, 4)
+        assert calls == [1]
+        assert all(result is results[0] for result in results)
+        assert singleflight.stats()['calls'] == 1
+        assert singleflight.stats()['in_flight'] == 0
+
+
+    def test_error_is_raised_in_all_callers(self):
+        singleflight = SingleFlight(ttl=10)
+        error = ValueError('provider failed')
+
+        def fail():
+            raise error
+
+        results = run_coalesced(singleflight, fail, 3)
+        assert results == [error, error, error]
+        assert singleflight.stats()['cache_size'] == 0
+        assert singleflight.do(('key',), lambda: 'retried') == 'retried'
+
+
+    def test_different_keys_are_not_coalesced(self):
+        singleflight = SingleFlight()
+        assert singleflight.do(('a',), lambda: 1) == 1
+        assert singleflight.do(('b',), lambda: 2) == 2
+        assert singleflight.stats()['calls'] == 2
+
+
+    def test_without_ttl_nothing_is_cached(self):
+        singleflight = SingleFlight()
+        assert singleflight.do(('key',), lambda: 1) == 1
+        assert singleflight.do(('key',), lambda: 2) == 2
+        assert singleflight.get(('key',)) is None
+
+
+    def test_ttl(self):
+        singleflight = SingleFlight(ttl=0.1)
+        assert singleflight.do(('key',), lambda: 1) == 1
+        assert singleflight.do(('key',), lambda: 2) == 1
+        assert singleflight.stats()['cached'] == 1
+        time.sleep(0.15)
+        assert singleflight.do(('key',), lambda: 3) == 3
+
+
+    def test_max_size(self):
+        singleflight = SingleFlight(ttl=10, max_size=2)
+        for key in range(3):
+            singleflight.set((key,), key)
+        assert singleflight.get((0,)) is None
+        assert singleflight.get((2,)) == 2
@@ -0,0 +1,51 @@
+# -*- coding: UTF-8 -*-
+# flake8: noqa: E303, W503
+
+import io
+import json
+
+import pytest
+
+from datanal.client import stream
+from datanal.client.stream import iter_document_items, iter_stream_items
+
+
+DOCUMENTS = [
+    ('data.item', {
+        'total': 3,
+        'last_page': 2,
+        'next': None,
+        'links': {'self': '/series?page=1'},
+        'data': [
+            {'id': 1, 'title': 'Final', 'rosters': [{'id': 10, 'players': ['a', 'b']}], 'score': 0.5},
+            {'id': 2, 'title': 'Semifinal', 'rosters': [], 'finished': True},
+            [1, 2]
+        ]
+    }),
+    ('item', [{'id': 1, 'games': [{'id': 11}]}, 'text', 3, None]),
+    ('data.item', {'data': [], 'total': 0}),
+    ('data.item', {'errors': ['not found']})
+]
+
+
+@pytest.mark.skipif(stream.ijson is None, reason='ijson is not installed')
+class TestIterItems(object):
+
+    @pytest.mark.parametrize('prefix, document', DOCUMENTS)
+    def test_stream_equals_document(self, prefix, document):
+        document_meta = {}
+        stream_meta = {}
+        items = list(iter_document_items(json.loads(json.dumps(document)), prefix, document_meta))
+        fh = io.BytesIO(json.dumps(document).encode('utf-8'))
+        assert list(iter_stream_items(fh, prefix, stream_meta)) == items
+        assert stream_meta == document_meta
+
+
+    def test_items_and_meta(self):
+        prefix, document = DOCUMENTS[0]
+        meta = {}
+        fh = io.BytesIO(json.dumps(document).encode('utf-8'))
+        items = iter_stream_items(fh, prefix, meta)
+        assert next(items)['id'] == 1
+        assert [item['id'] for item in items if isinstance(item, dict)] == [2]
+        assert meta == {'total': 3, 'last_page': 2, 'next': None, 'links': None, 'data': None}
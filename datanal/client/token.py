@@ -0,0 +1,143 @@
+# -*- coding: UTF-8 -*-
+
+import os
+import json
+import time
+import uuid
+import threading
+
+
+class AuthenticationError(Exception):
+    pass
+
+
+class TokenManager(object):
+    '''Access token shared by all threads of one process
+
+    Token is refreshed by `fetch` (returns token and its lifetime in seconds or None) when it is missing,
+    expired or rejected by the provider. Only one thread refreshes, the others wait and get the new token.
+    Timer thread refreshes the token `refresh_margin` seconds before it expires, so requests do not wait for it.
+    With `cache_path` the token is kept on disk too, restarted workers reuse it until it expires.
+    '''
+
+    def __init__(self, fetch: callable, refresh_margin: float = 60, cache_path: str = None):
+        self._fetch = fetch
+        self._refresh_margin = refresh_margin
+        self._cache_path = cache_path
+        self._lock = threading.Lock()
+        self._timer = None
+        self._token = None
+        self._expires_at = None  # Unix time, None = does not expire
+        self._stats = {'refreshes': 0, 'shared': 0, 'background': 0}
+        self._load_cache()
+
+
+    def _is_valid(self) -> bool:
+        # Caller has to hold the lock
+        return self._token is not None and (self._expires_at is None or self._expires_at > time.time())
+
+
+    @property
+    def token(self) -> str:
+        # Valid token or None, does not refresh
+        with self._lock:
+            return self._token if self._is_valid() else None
+
+
+    def set(self, token: str, expires_in: float = None) -> None:
+        with self._lock:
+            self._set(token, expires_in)
+
+
+    def _set(self, token: str, expires_in: float = None) -> None:
+        # Caller has to hold the lock
+        self._token = token
+        self._expires_at = time.time() + float(expires_in) if expires_in else None
+        self._save_cache()
+        self._schedule_refresh()
+
+
+    def get(self) -> str:
+        # Valid token, refreshed when needed
+        token = self.token
+        if token is not None:
+            return token
+        return self.refresh()
+
+
+    def refresh(self, stale_token: str = None) -> str:
+        '''Fetch new token
+
+        `stale_token` is the token rejected by the provider, when another thread has already replaced it
+        (or it is missing), the current token is returned without a new fetch.
+        '''
+        with self._lock:
+            if self._is_valid() and self._token != stale_token:
+                self._stats['shared'] += 1
+                return self._token
+            token, expires_in = self._fetch()
+            self._stats['refreshes'] += 1
+            self._set(token, expires_in)
+            return self._token
+
+
+    def _schedule_refresh(self) -> None:
+        # Caller has to hold the lock
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._expires_at is None:
+            return
+        delay = max(self._expires_at - self._refresh_margin - time.time(), 0)
+        self._timer = threading.Timer(delay, self._refresh_in_background, args=(self._token, ))
+        self._timer.daemon = True
+        self._timer.start()
+
+
+    def _refresh_in_background(self, token: str) -> None:
+        try:
+            with self._lock:
+                if self._token != token:
+                    return  # Already refreshed
+                new_token, expires_in = self._fetch()
+                self._stats['refreshes'] += 1
+                self._stats['background'] += 1
+                self._set(new_token, expires_in)
+        except Exception:
+            pass  # Token is refreshed on demand when it expires
+
+
+    def _load_cache(self) -> None:
+        if self._cache_path is None or not os.path.exists(self._cache_path):
+            return
+        try:
+            with open(self._cache_path) as fh:
+                cache = json.load(fh)
+            token, expires_at = cache['token'], cache['expires_at']
+        except (ValueError, KeyError):
+            return  # Broken cache, token is fetched again
+        if expires_at is not None and expires_at - self._refresh_margin <= time.time():
+            return
+        with self._lock:
+            self._token, self._expires_at = token, expires_at
+            self._schedule_refresh()
+
+
+    def _save_cache(self) -> None:
+        # Caller has to hold the lock
+        if self._cache_path is None:
+            return
+        os.makedirs(os.path.dirname(self._cache_path), exist_ok=True)
+        tmp_file_path = '{}.{}.tmp'.format(self._cache_path, uuid.uuid4().hex)
+        fd = os.open(tmp_file_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)  # Token is a credential
+        with os.fdopen(fd, 'w') as fh:
+            json.dump({'token': self._token, 'expires_at': self._expires_at}, fh)
+        os.replace(tmp_file_path, self._cache_path)
+
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['valid'] = self._is_valid()
+            stats['expires_in'] = round(self._expires_at - time.time(), 1) if self._expires_at else None
+        return stats
@@ -0,0 +1,73 @@
+# -*- coding: UTF-8 -*-
+
+from contextlib import contextmanager
+
+import cherrypy
+
+from datanal.config.api_settings import api_config
+
+
+COMMIT_MODES = ['game', 'batch', 'page', 'run']
+
+
+class Committer(object):
+    '''Commit work of watcher and grabber runs in parts, each game inside a savepoint
+
+    Modes: "game" commits after every game, "batch" after every `batch_size` games, "page" after every page
+    of provider listing (`page_done()`), "run" only at the end (`finish()`). Failed game is rolled back
+    to its savepoint and passed to `on_error(error, label)`, the other games of the batch are kept.
+    `game_failed` tells whether the last game was rolled back.
+    `before_commit()` is called in the transaction right before each commit (e.g. to save progress counters).
+    '''
+
+    def __init__(
+            self, sql: object, mode: str = None, batch_size: int = None,
+            on_error: callable = None, before_commit: callable = None):
+        self._sql = sql
+        self._mode = mode or api_config['commit_mode']
+        if self._mode not in COMMIT_MODES:
+            raise ValueError('Unknown commit mode "{}", use one of {}'.format(self._mode, COMMIT_MODES))
+        self._batch_size = batch_size or api_config['commit_batch_size']
+        self._on_error = on_error
+        self._before_commit = before_commit
+        self._pending = 0
+        self.game_failed = False
+        self._sql.start_trans_mode()
+
+
+    @contextmanager
+    def game(self, label: str = None) -> iter:
+        self._sql.savepoint('game')
+        self.game_failed = False
+        try:
+            yield
+        except Exception as e:
+            self._sql.rollback_to_savepoint('game')
+            self.game_failed = True
+            if self._on_error is None or (isinstance(e, cherrypy.HTTPError) and e.status == 408):
+                raise  # Application request timeout ends the whole run
+            self._on_error(e, label)
+        else:
+            self._sql.release_savepoint('game')
+            self._pending += 1
+            if self._mode == 'game' or (self._mode == 'batch' and self._pending >= self._batch_size):
+                self.commit()
+
+
+    def page_done(self) -> None:
+        if self._mode in ('game', 'batch', 'page'):
+            self.commit()
+
+
+    def commit(self) -> None:
+        if self._before_commit is not None:
+            self._before_commit()
+        self._sql.finish_trans_mode()
+        self._sql.start_trans_mode()
+        self._pending = 0
+
+
+    def finish(self, action: str = 'commit') -> None:
+        if action == 'commit' and self._before_commit is not None:
+            self._before_commit()
+        self._sql.finish_trans_mode(action)
@@ -8,18 +8,64 @@ api_config = {
     'data_sources': ['provider1', 'provider2'],
     'game_names': ['csgo', 'dota2', 'lol'],
     'watch_limit': 20,  # minutes
+    'daemon_watch_interval': float(os.getenv('DAEMON_WATCH_INTERVAL', 120)),  # seconds, bin/collect-daemon.py
+    'daemon_collect_interval': float(os.getenv('DAEMON_COLLECT_INTERVAL', 60)),  # seconds
+    'poll_interval_min': float(os.getenv('POLL_INTERVAL_MIN', 60)),  # seconds, game with changing stats
+    'poll_interval_max': float(os.getenv('POLL_INTERVAL_MAX', 600)),  # seconds, doubled by each unchanged poll
+    'last_stats_cache_size': int(os.getenv('LAST_STATS_CACHE_SIZE', 1000)),  # Watched games in memory, 0 = disabled
+    'commit_mode': os.getenv('COMMIT_MODE', 'game'),  # game, batch (of commit_batch_size games), page or run
+    'commit_batch_size': int(os.getenv('COMMIT_BATCH_SIZE', 10)),
+    'collect_lease_ttl': int(os.getenv('COLLECT_LEASE_TTL', 300)),  # seconds, game claimed by collector, 0 = off
+    'watermark_overlap': int(os.getenv('WATERMARK_OVERLAP', 10)),  # minutes listed again before tournament watermark
     'provider1': {
         'url': os.getenv('PROVIDER1_URL', 'http://some-url.com'),
         'client_id': os.getenv('PROVIDER1_CLIENT_ID', '12345'),
         'client_secret': os.getenv('PROVIDER1_CLIENT_SECRET', 'abc123'),
+        'token_refresh_margin': float(os.getenv('PROVIDER1_TOKEN_REFRESH_MARGIN', 60)),  # seconds before expiry
+        'token_cache': os.getenv('PROVIDER1_TOKEN_CACHE', 'false').lower() == 'true',  # Keep token in path_storage
         'log': os.getenv('PROVIDER1_LOG', True),
-        'requests_per_second': float(os.getenv('PROVIDER1_REQUESTS_PER_SECOND', 1))
+        'requests_per_second': float(os.getenv('PROVIDER1_REQUESTS_PER_SECOND', 1)),
+        'requests_burst': int(os.getenv('PROVIDER1_REQUESTS_BURST', 1)),  # Token bucket capacity
+        'rate_limiter': os.getenv('PROVIDER1_RATE_LIMITER', 'thread'),  # thread, file (shared by processes)
+        'pool_size': int(os.getenv('PROVIDER1_POOL_SIZE', 10)),  # Keep-alive HTTP connections
+        'max_concurrency': int(os.getenv('PROVIDER1_MAX_CONCURRENCY', 4)),  # Requests in flight (async client)
+        'collect_concurrency': int(os.getenv('PROVIDER1_COLLECT_CONCURRENCY', 4)),  # Games fetched in parallel
+        'watch_concurrency': int(os.getenv('PROVIDER1_WATCH_CONCURRENCY', 4)),  # Tournaments fetched in parallel
+        'cache_ttl': float(os.getenv('PROVIDER1_CACHE_TTL', 0)),  # Seconds to reuse responses, 0 = disabled
+        'http_mode': os.getenv('PROVIDER1_HTTP_MODE', 'live'),  # live, record, replay (responses in path_storage)
+        'max_retries': int(os.getenv('PROVIDER1_MAX_RETRIES', 3)),  # 429, 5xx and connection errors
+        'retry_backoff': float(os.getenv('PROVIDER1_RETRY_BACKOFF', 0.5)),  # seconds, doubled each attempt
+        'retry_backoff_max': float(os.getenv('PROVIDER1_RETRY_BACKOFF_MAX', 30)),  # seconds
+        'retry_after_max': float(os.getenv('PROVIDER1_RETRY_AFTER_MAX', 300)),  # seconds, cap of Retry-After
+        'adaptive_rate': os.getenv('PROVIDER1_ADAPTIVE_RATE', 'false').lower() == 'true',  # Rate from quota headers
+        'requests_per_second_min': float(os.getenv('PROVIDER1_REQUESTS_PER_SECOND_MIN', 0.1)),  # Adaptive rate bounds
+        'requests_per_second_max': float(os.getenv('PROVIDER1_REQUESTS_PER_SECOND_MAX', 2)),
+        'rate_remaining_header': os.getenv('PROVIDER1_RATE_REMAINING_HEADER', 'X-Rate-Limit-Remaining'),
+        'rate_reset_header': os.getenv('PROVIDER1_RATE_RESET_HEADER', 'X-Rate-Limit-Reset'),  # seconds or timestamp
+        'rate_window': float(os.getenv('PROVIDER1_RATE_WINDOW', 3600))  # Quota window without reset header, seconds
     },
     'provider2': {
         'url': os.getenv('PROVIDER2_URL', 'http://some-url.com'),
         'auth_token': os.getenv('PROVIDER2_AUTH_TOKEN', '12345'),
         'log': os.getenv('PROVIDER2_LOG', True),
-        'requests_per_second': float(os.getenv('PROVIDER2_REQUESTS_PER_SECOND', 2.5))
+        'requests_per_second': float(os.getenv('PROVIDER2_REQUESTS_PER_SECOND', 2.5)),
+        'requests_burst': int(os.getenv('PROVIDER2_REQUESTS_BURST', 1)),  # Token bucket capacity
+        'rate_limiter': os.getenv('PROVIDER2_RATE_LIMITER', 'thread'),  # thread, file (shared by processes)
+        'pool_size': int(os.getenv('PROVIDER2_POOL_SIZE', 10)),  # Keep-alive HTTP connections
+        'max_concurrency': int(os.getenv('PROVIDER2_MAX_CONCURRENCY', 4)),  # Requests in flight (async client)
+        'collect_concurrency': int(os.getenv('PROVIDER2_COLLECT_CONCURRENCY', 4)),  # Games fetched in parallel
+        'cache_ttl': float(os.getenv('PROVIDER2_CACHE_TTL', 0)),  # Seconds to reuse responses, 0 = disabled
+        'http_mode': os.getenv('PROVIDER2_HTTP_MODE', 'live'),  # live, record, replay (responses in path_storage)
+        'max_retries': int(os.getenv('PROVIDER2_MAX_RETRIES', 3)),  # 429, 5xx and connection errors
+        'retry_backoff': float(os.getenv('PROVIDER2_RETRY_BACKOFF', 0.5)),  # seconds, doubled each attempt
+        'retry_backoff_max': float(os.getenv('PROVIDER2_RETRY_BACKOFF_MAX', 30)),  # seconds
+        'retry_after_max': float(os.getenv('PROVIDER2_RETRY_AFTER_MAX', 300)),  # seconds, cap of Retry-After
+        'adaptive_rate': os.getenv('PROVIDER2_ADAPTIVE_RATE', 'false').lower() == 'true',  # Rate from quota headers
+        'requests_per_second_min': float(os.getenv('PROVIDER2_REQUESTS_PER_SECOND_MIN', 0.1)),  # Adaptive rate bounds
+        'requests_per_second_max': float(os.getenv('PROVIDER2_REQUESTS_PER_SECOND_MAX', 5)),
+        'rate_remaining_header': os.getenv('PROVIDER2_RATE_REMAINING_HEADER', 'X-Rate-Limit-Remaining'),
+        'rate_reset_header': os.getenv('PROVIDER2_RATE_RESET_HEADER', 'X-Rate-Limit-Reset'),  # seconds or timestamp
+        'rate_window': float(os.getenv('PROVIDER2_RATE_WINDOW', 3600))  # Quota window without reset header, seconds
     }
 }
 
@@ -33,6 +79,7 @@ for game_name in api_config['game_names']:
     for file_path in [conf_path, tournaments_path]:
         with open(file_path[1]) as fh:
             try:
+                # Not `datanal.tools.from_json`, datanal.tools imports this module (read once at start anyway)
                 api_config[file_path[0]] = json.load(fh)
             except ValueError:
                 raise RuntimeError('Invalid JSON file "{}"'.format(file_path[1]))
@@ -7,6 +7,8 @@ from config.default import instance_dirpath
 from datanal.tools import import_dynamically
 from datanal.watcher import get_watcher_for_api
 from datanal.grabber import get_grabber_for_api
+from datanal.client.scheduler import request_context
+from datanal.client.stream import iter_document_items, iter_response_items
 
 
 class UnknownAdapter(Exception):
@@ -26,16 +28,80 @@ class RestClientInterface(object):
         raise NotImplementedError
 
 
+    def send_request(self, api_endpoint: str, data: dict = {}) -> tuple:
+        raise NotImplementedError
+
+
+    def send_requests(self, api_endpoints: list, data: dict = {}) -> list:
+        # Send requests concurrently under the rate limit, (headers, data) results keep order of endpoints
+        return self._async_client.send_requests(api_endpoints, data)
+
+
+    def send_request_stream(self, api_endpoint: str, prefix: str, data: dict = {}) -> tuple:
+        # Returns (headers, items at ijson `prefix` parsed while the body is downloading, top-level scalars)
+        # Top-level scalars (e.g. pagination) are complete after all items were read
+        meta = {}
+        url = self._build_url(api_endpoint)
+        try:
+            response = self._get_pool().get(api_endpoint, url, data, self._logging, stream=True)
+        except Exception as e:
+            self._request_error(e, url)
+        if response.status_code != 200:
+            # Errors and re-authentication are handled by the whole document request
+            response.close()
+            headers, body = self.send_request(api_endpoint, data)
+            return headers, iter_document_items(body, prefix, meta), meta
+        return response.headers, iter_response_items(response, prefix, meta), meta
+
+
+    def _get_pool(self) -> object:
+        raise NotImplementedError
+
+
+    def _build_url(self, api_endpoint: str) -> str:
+        raise NotImplementedError
+
+
+    def _is_token_invalid(self, status_code: int, data: dict) -> bool:
+        return False
+
+
+    def _reauthenticate(self, url: str, data: dict) -> None:
+        raise NotImplementedError
+
+
+    def _check_response(self, status_code: int, data: dict) -> None:
+        pass
+
+
+    def _request_error(self, e: Exception, url: str) -> None:
+        raise e
+
+
     def watch_current_games(self, game_name: str):
-        return get_watcher_for_api(self._name, game_name, self._log).watch_current_games()
+        with request_context('watch', game_name):  # Requests are scheduled by job type and game
+            return get_watcher_for_api(self._name, game_name, self._log).watch_current_games()
 
 
     def collect_current_data(self, game_name: str):
-        return get_watcher_for_api(self._name, game_name, self._log).collect_current_data()
+        with request_context('collect', game_name):
+            return get_watcher_for_api(self._name, game_name, self._log).collect_current_data()
+
+
+    def ingest_event(self, game_name: str, event_type: str, event_id: str, payload: dict) -> str:
+        job_type = 'watch' if event_type == 'match_finished' else 'collect'
+        with request_context(job_type, game_name):
+            return get_watcher_for_api(self._name, game_name, self._log).ingest_event(event_type, event_id, payload)
 
 
     def grab_past_data(self, game_name: str, date_from: datetime.date, date_to: datetime.date, delete_old: bool):
-        return get_grabber_for_api(self._name, game_name, self._log).grab_past_data(date_from, date_to, delete_old)
+        with request_context('grab', game_name):
+            return get_grabber_for_api(self._name, game_name, self._log).grab_past_data(
+                date_from, date_to, delete_old)
+
+
+    def stats(self) -> dict:
+        raise NotImplementedError
 
 
     def monitor(self) -> float:
@@ -0,0 +1,111 @@
+# -*- coding: UTF-8 -*-
+
+import os
+import time
+import signal
+import threading
+
+from lib import tools as app_tools
+from lib.libpool import LibPool
+from config.settings import app_config
+from datanal.config.api_settings import api_config
+from datanal.connector import get_connector_for_api
+from datanal.watcher import get_watcher_for_api
+from datanal.client.scheduler import request_context
+from datanal.tools import get_time_limit, get_tournaments
+
+
+class CollectDaemon(object):
+    '''Watch and collect current games in process, without HTTP calls of the server
+
+    Each data source and game name pair runs in own thread with its client, watcher and database connection
+    reused between iterations, requests of all threads share the provider rate limiters. Games are watched every
+    `watch_interval` and collected every `collect_interval` seconds while the watching flag is set
+    (see /start-watching). `stop()` lets running iterations finish and ends the threads.
+    '''
+
+    def __init__(
+            self, data_sources: list = None, game_names: list = None,
+            watch_interval: float = None, collect_interval: float = None, log: bool = True):
+        self._data_sources = data_sources or api_config['data_sources']
+        self._game_names = game_names or api_config['game_names']
+        self._watch_interval = watch_interval or api_config['daemon_watch_interval']
+        self._collect_interval = collect_interval or api_config['daemon_collect_interval']
+        self._log = log
+        self._stop = threading.Event()
+        self._threads = []
+        self.logger = LibPool().logger
+
+
+    @property
+    def is_watching(self) -> bool:
+        flag_file_path = os.path.normpath(os.path.join(app_config['path_storage'], 'tmp', 'watching_flag.txt'))
+        return os.path.exists(flag_file_path)
+
+
+    def start(self) -> None:
+        for data_src in self._data_sources:
+            for game_name in self._game_names:
+                thread = threading.Thread(
+                    target=self._run, args=(data_src, game_name), name='collect-{}-{}'.format(data_src, game_name))
+                thread.start()
+                self._threads.append(thread)
+
+
+    def stop(self, *args) -> None:
+        # Usable as a signal handler
+        self._stop.set()
+
+
+    def join(self) -> None:
+        # Wait in short steps, so the main thread can handle signals
+        for thread in self._threads:
+            while thread.is_alive():
+                thread.join(1)
+
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        self.logger.info('Starting collect daemon for {} and {}'.format(self._data_sources, self._game_names))
+        self.start()
+        self.join()
+        self.logger.info('Collect daemon stopped')
+
+
+    def _run(self, data_src: str, game_name: str) -> None:
+        # Client has to be created before the watcher in the same thread, the watcher uses its requests
+        get_connector_for_api(data_src, self._log)
+        watcher = get_watcher_for_api(data_src, game_name, self._log)
+        next_watch = next_collect = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                now = time.monotonic()
+                if now >= next_watch:
+                    next_watch = now + self._watch_interval
+                    self._run_job('watch', watcher, game_name)
+                if not self._stop.is_set() and now >= next_collect:
+                    next_collect = now + self._collect_interval
+                    self._run_job('collect', watcher, game_name)
+                self._stop.wait(max(0, min(next_watch, next_collect) - time.monotonic()))
+        finally:
+            app_tools.disconnect_database()
+
+
+    def _run_job(self, job_type: str, watcher: object, game_name: str) -> None:
+        if not self.is_watching:
+            return
+        # Settings saved through the server since the last iteration
+        watcher.time_limit = int(get_time_limit())
+        tournaments_key = '{}_tournaments'.format(game_name)
+        api_config[tournaments_key] = get_tournaments(game_name)['tournaments']
+        try:
+            with request_context(job_type, game_name):
+                if job_type == 'watch':
+                    watcher.watch_current_games()
+                else:
+                    watcher.collect_current_data()
+        except Exception:
+            self.logger.exception('Collect daemon job "{}" of "{}" "{}" failed'.format(
+                job_type, watcher._name, game_name))
+            app_tools.disconnect_database()  # Unfinished transaction is rolled back, next job gets clean connection
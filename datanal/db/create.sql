@@ -38,6 +38,11 @@ CREATE TABLE "current_game_watch" (
     "insert_datetime" "d.current_datetime",
     "is_watching" "d.boolean",
     "is_deleted" "d.boolean" DEFAULT false,
+    "stats_hash" CHAR(64) DEFAULT NULL, -- Hash of last saved team and player stats
+    "unchanged_polls" "d.smallint" NOT NULL DEFAULT 0, -- Polls in a row without changed stats
+    "next_poll_datetime" "d.datetime" DEFAULT NULL, -- Game is not collected before
+    "lease_owner" VARCHAR(255) DEFAULT NULL, -- Collect worker processing the game
+    "lease_expire_datetime" "d.datetime" DEFAULT NULL, -- Game can be claimed by other worker after
 
     CONSTRAINT "pk.current_game_watch"
         PRIMARY KEY("id")
@@ -241,6 +246,35 @@ INSERT INTO "current_game_analysis" ("data_src", "game_name") VALUES ('provider2
 INSERT INTO "current_game_analysis" ("data_src", "game_name") VALUES ('provider2', NULL);
 
 
+CREATE TABLE "current_game_watermark" (
+    "data_src" "d.data_src",
+    "game_name" "d.game_name",
+    "data_src_tournament_id" "d.int" NOT NULL, -- League for provider2
+    "last_finish_datetime" "d.datetime" NOT NULL, -- Newest finish of series seen by watch
+    "update_datetime" "d.current_datetime",
+
+    CONSTRAINT "uq.current_game_watermark.src_tournament"
+        UNIQUE ("data_src", "game_name", "data_src_tournament_id")
+);
+
+
+CREATE SEQUENCE "s.current_game_event";
+CREATE TABLE "current_game_event" (
+    "id" "d.primary_key" DEFAULT nextval('"s.current_game_event"'),
+    "data_src" "d.data_src",
+    "game_name" "d.game_name",
+    "event_id" VARCHAR(255) NOT NULL, -- Given by sender or hash of the event
+    "event_type" VARCHAR(20) NOT NULL,
+    "insert_datetime" "d.current_datetime",
+
+    CONSTRAINT "pk.current_game_event"
+        PRIMARY KEY("id"),
+
+    CONSTRAINT "uq.current_game_event.src_event"
+        UNIQUE ("data_src", "event_id")
+);
+
+
 -- past data
 
 CREATE SEQUENCE "s.past_game_stats";
@@ -358,3 +392,50 @@ INSERT INTO "past_game_analysis" ("data_src", "game_name") VALUES ('provider1',
 INSERT INTO "past_game_analysis" ("data_src", "game_name") VALUES ('provider2', 'csgo');
 INSERT INTO "past_game_analysis" ("data_src", "game_name") VALUES ('provider2', 'dota2');
 INSERT INTO "past_game_analysis" ("data_src", "game_name") VALUES ('provider2', 'lol');
+
+
+CREATE SEQUENCE "s.past_game_checkpoint";
+CREATE TABLE "past_game_checkpoint" (
+    "id" "d.primary_key" DEFAULT nextval('"s.past_game_checkpoint"'),
+    "data_src" "d.data_src",
+    "game_name" "d.game_name",
+    "date_from" "d.date" DEFAULT NULL,
+    "date_to" "d.date" DEFAULT NULL,
+    "last_page" "d.int" NOT NULL DEFAULT 0, -- Last completed page of provider listing, progress only
+    "is_finished" "d.boolean",
+    "insert_datetime" "d.current_datetime",
+    "update_datetime" "d.datetime" DEFAULT NULL,
+
+    CONSTRAINT "pk.past_game_checkpoint"
+        PRIMARY KEY("id")
+);
+
+
+CREATE TABLE "past_game_checkpoint_match" (
+    "checkpoint_id" "d.foreign_key" NOT NULL,
+    "data_src_match_id" "d.int" NOT NULL, -- Serie for provider1, completed with all its games
+
+    CONSTRAINT "fk.past_game_checkpoint_match.checkpoint"
+        FOREIGN KEY ("checkpoint_id")
+        REFERENCES "past_game_checkpoint" ("id")
+        ON UPDATE RESTRICT
+        ON DELETE CASCADE,
+
+    CONSTRAINT "uq.past_game_checkpoint_match.checkpoint_match"
+        UNIQUE ("checkpoint_id", "data_src_match_id")
+);
+
+
+CREATE TABLE "past_game_checkpoint_game" (
+    "checkpoint_id" "d.foreign_key" NOT NULL,
+    "data_src_game_id" "d.int" NOT NULL, -- Match for provider1, finished as saved, invalid or failed
+
+    CONSTRAINT "fk.past_game_checkpoint_game.checkpoint"
+        FOREIGN KEY ("checkpoint_id")
+        REFERENCES "past_game_checkpoint" ("id")
+        ON UPDATE RESTRICT
+        ON DELETE CASCADE,
+
+    CONSTRAINT "uq.past_game_checkpoint_game.checkpoint_game"
+        UNIQUE ("checkpoint_id", "data_src_game_id")
+);
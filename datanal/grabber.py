@@ -11,6 +11,7 @@ from datanal.config.api_settings import api_config
 from lib.libpool import LibPool
 from config.default import instance_dirpath
 from datanal.tools import import_dynamically
+from datanal.committer import Committer
 from datanal.transformer import get_transformer_for_api
 
 
@@ -18,6 +19,12 @@ class UnknownAdapter(Exception):
     pass
 
 
+# Counters of `past_game_analysis` added up by each save of the progress
+ANALYSIS_COUNTERS = [
+    'matches_total_count', 'matches_invalid_count', 'games_total_count', 'games_invalid_count',
+    'datapoints_unavailable_count']
+
+
 class GrabberInterface(object):
     '''Define the interface that Adapter uses
     '''
@@ -34,8 +41,15 @@ class GrabberInterface(object):
 
 
     def grab_past_data(self, date_from: datetime.date, date_to: datetime.date, delete_old: bool) -> OrderedDict:
-        if delete_old:
-            self._delete_past_db()
+        # Unfinished grab of the same date range (request timeout, provider error, restart) is resumed
+        # from its checkpoint, data it saved are not deleted. Listing is walked again from the first page,
+        # matches completed by the checkpoint are skipped without fetching their games, finished games
+        # of interrupted match are skipped and not counted again.
+        checkpoint = self._get_checkpoint(date_from, date_to)
+        if checkpoint is None:
+            if delete_old:
+                self._delete_past_db()
+            checkpoint = self._start_checkpoint(date_from, date_to)
         empty_stats = {
             'data_src': '',
             'game_name': '',
@@ -47,13 +61,14 @@ class GrabberInterface(object):
             'datapoints_missing_count': 0,
             'datapoints_unavailable_count': 0
         }
-        stats = self._find_and_save_past_games(date_from, date_to, empty_stats)
+        stats = self._find_and_save_past_games(date_from, date_to, empty_stats, checkpoint)
         if 'return_msg' in stats:
             return stats['return_msg']
-        # Return analysis informations
+        # Return analysis informations, of this run when it was resumed
         return OrderedDict([
             ('api', stats['data_src']),
             ('game', stats['game_name']),
+            ('resumed_done_matches', len(checkpoint['done_match_ids']) if checkpoint['is_resumed'] else None),
             ('processed_matches', stats['matches_total_count']),
             ('invalid_matches', stats['matches_invalid_count']),
             ('processed_games', stats['games_total_count']),
@@ -85,14 +100,131 @@ class GrabberInterface(object):
                 AND "game_name" = %(game_name)s;
         '''
         cur.q(Q, params={'data_src': self._data_src, 'game_name': self._game_name})
+        # Progress of unfinished grabs (any date range) is not valid without their data
+        Q = '''
+            UPDATE "past_game_checkpoint" SET
+                "is_finished" = true,
+                "update_datetime" = now()
+            WHERE "data_src" = %(data_src)s
+                AND "game_name" = %(game_name)s
+                AND "is_finished" = false;
+        '''
+        cur.q(Q, params={'data_src': self._data_src, 'game_name': self._game_name})
         self.sql.finish_trans_mode()
 
 
-    def _find_and_save_past_games(self, date_from: datetime.date, date_to: datetime.date) -> dict:
+    def _find_and_save_past_games(
+            self, date_from: datetime.date, date_to: datetime.date, stats: dict, checkpoint: dict = None) -> dict:
         raise NotImplementedError
 
 
-    def _transform_stats_and_save_analysis(self, data_src: str, stats: dict) -> dict:
+    def _get_checkpoint(self, date_from: datetime.date, date_to: datetime.date) -> dict:
+        # Unfinished grab of the date range with ids of its completed matches
+        cur = self.sql.cursor()
+        checkpoint = cur.qfo('''
+            SELECT * FROM "past_game_checkpoint"
+            WHERE "data_src" = %(data_src)s
+            AND "game_name" = %(game_name)s
+            AND "date_from" IS NOT DISTINCT FROM CAST(%(date_from)s AS date)
+            AND "date_to" IS NOT DISTINCT FROM CAST(%(date_to)s AS date)
+            AND "is_finished" = false
+            ORDER BY "id" DESC
+            LIMIT 1
+        ''', {'data_src': self._name, 'game_name': self._game_name, 'date_from': date_from, 'date_to': date_to})
+        if not checkpoint:
+            return None
+        checkpoint['is_resumed'] = True
+        checkpoint['done_match_ids'] = set(cur.qfa('''
+            SELECT "data_src_match_id" FROM "past_game_checkpoint_match" WHERE "checkpoint_id" = %s
+        ''', [checkpoint['id']], key='data_src_match_id'))
+        return checkpoint
+
+
+    def _start_checkpoint(self, date_from: datetime.date, date_to: datetime.date) -> dict:
+        cur = self.sql.cursor()
+        cur.insert('past_game_checkpoint', {
+            'data_src': self._name,
+            'game_name': self._game_name,
+            'date_from': date_from or None,
+            'date_to': date_to or None
+        })
+        checkpoint = cur.qfo('''
+            SELECT * FROM "past_game_checkpoint" WHERE "id" = %s
+        ''', [cur.get_last_id('past_game_checkpoint')])
+        checkpoint['is_resumed'] = False
+        checkpoint['done_match_ids'] = set()
+        return checkpoint
+
+
+    def _save_checkpoint_match(self, checkpoint: dict, match_id: int) -> None:
+        # Match (serie) with all its games saved, committed together with them
+        cur = self.sql.cursor()
+        cur.insert('past_game_checkpoint_match', {'checkpoint_id': checkpoint['id'], 'data_src_match_id': match_id})
+
+
+    def _save_checkpoint_game(self, checkpoint: dict, game_id: int) -> None:
+        # Game finished as saved, invalid or failed, committed together with it and counters of its match
+        cur = self.sql.cursor()
+        cur.insert('past_game_checkpoint_game', {'checkpoint_id': checkpoint['id'], 'data_src_game_id': game_id})
+
+
+    def _save_checkpoint_page(self, checkpoint: dict, page: int) -> None:
+        # Page completed, shown as progress only, listing can shift between runs
+        cur = self.sql.cursor()
+        cur.update('past_game_checkpoint', {
+            'last_page': page,
+            'update_datetime': datetime.datetime.utcnow()
+        }, {'id': checkpoint['id']})
+
+
+    def _finish_checkpoint(self, checkpoint: dict) -> None:
+        # Next grab of the date range starts over
+        cur = self.sql.cursor()
+        cur.update('past_game_checkpoint', {
+            'is_finished': True,
+            'update_datetime': datetime.datetime.utcnow()
+        }, {'id': checkpoint['id']})
+
+
+    def _get_games_to_save(self, checkpoint: dict, games: list) -> list:
+        # Games [(stats_game_id, game)] not finished by the checkpoint, match (serie) not completed
+        # by resumed grab can have some of them finished already
+        if not games or not checkpoint['is_resumed']:
+            return games
+        cur = self.sql.cursor()
+        finished = cur.qfa('''
+            SELECT "data_src_game_id" FROM "past_game_checkpoint_game"
+            WHERE "checkpoint_id" = %s
+            AND "data_src_game_id" IN %s
+        ''', [checkpoint['id'], [game['id'] for stats_game_id, game in games]], key='data_src_game_id')
+        return [(stats_game_id, game) for stats_game_id, game in games if game['id'] not in finished]
+
+
+    def _get_committer(self, stats: dict) -> Committer:
+        # Games are committed by `commit_mode` together with counters of `past_game_analysis` saved so far,
+        # failed game is rolled back, logged and counted as invalid
+        saved = {key: stats[key] for key in ANALYSIS_COUNTERS}
+
+        def save_progress():
+            delta = {key: stats[key] - saved[key] for key in ANALYSIS_COUNTERS}
+            if any(delta.values()):
+                self._transform_stats_and_save_analysis(self._name, delta)
+                saved.update({key: stats[key] for key in ANALYSIS_COUNTERS})
+
+        def on_error(error: Exception, url: str):
+            stats['games_invalid_count'] += 1
+            self._log_msg('error', 'Game stats could not be saved: {}'.format(error), url=url)
+
+        return Committer(self.sql, on_error=on_error, before_commit=save_progress)
+
+
+    def _raise_request_timeout(self, error: Exception) -> None:
+        # Application request timeout ends whole grab, other errors are isolated to the match
+        if isinstance(error, cherrypy.HTTPError) and error.status == 408:
+            raise error
+
+
+    def _transform_stats(self, data_src: str, stats: dict) -> dict:
         # Each team in all games has 5 players
         datapoints_wanted_count = api_config[self._game_name]['datapoints']
         stats['datapoints_wanted_count'] = 5 * datapoints_wanted_count * (
@@ -103,6 +235,11 @@ class GrabberInterface(object):
         stats['data_src'] = data_src
         stats['game_name'] = self._game_name
         stats['analysis_update_datetime'] = datetime.datetime.utcnow()
+        return stats
+
+
+    def _transform_stats_and_save_analysis(self, data_src: str, stats: dict) -> dict:
+        stats = self._transform_stats(data_src, stats)
         Q = '''
             UPDATE "past_game_analysis" SET
                 "matches_total_count" = "matches_total_count" + %(matches_total_count)s,
@@ -10,6 +10,8 @@ from lib.libpool import LibPool
 from datanal.grabber import GrabberInterface
 from datanal.validator import get_validator_for_api
 from datanal.transformer import get_transformer_for_api
+from datanal.client.pager import PageIterator
+from datanal.client.fetcher import FetchIterator
 
 
 class Grabber(GrabberInterface):
@@ -21,6 +23,7 @@ class Grabber(GrabberInterface):
     def __init__(self, *args, **kwargs):
         self.sql = self.lib_pool.libsql
         self.send_request = cherrypy.thread_data.client_obj.send_request
+        self.send_request_stream = cherrypy.thread_data.client_obj.send_request_stream
         if 'game_name' in kwargs:
             self._game_name = kwargs['game_name']
         if 'log' in kwargs:
@@ -47,55 +50,53 @@ class Grabber(GrabberInterface):
 
 
     def _find_and_save_past_games(
-            self, date_from: datetime.date = None, date_to: datetime.date = None, stats: dict = {}) -> dict:
-        self.sql.start_trans_mode()
+            self, date_from: datetime.date = None, date_to: datetime.date = None, stats: dict = {},
+            checkpoint: dict = None) -> dict:
+        committer = self._get_committer(stats)
         cur = self.sql.cursor()
         # Find games mentioned in configuration, save them in database table `past_game_stats`
         valid_tournament_ids = list(toolz.itertoolz.unique([
             y[self._name]['tournament_id'] for x, y in api_config['{}_tournaments'.format(self._game_name)].items()
             if y[self._name] and y[self._name]['tournament_id']]))
-        series = {'last_page': 1}  # Fake for loop start
-        series_current_page = 0
-        while series['last_page'] > series_current_page:  # Pagination
-            series_current_page += 1
-            # NOTE: `&tiers[]=1` is not necessary, when we filter tournament ids,
-            # its open to lower levels of tournaments for testing
-            # NOTE: &tournaments[]=123,345 does not work as expected, should be only one ID -> DO NOT USE IT!!!
-            url_s = 'series?games[]={}&with[]=matches&page={}'.format(
-                api_config[self._game_name]['provider1_id'],
-                series_current_page)
-            headers, series = self.send_request(api_endpoint=url_s)
-            if not series or 'data' not in series:
+        limit_from = None
+        if date_from:
+            limit_from = datetime.datetime.strptime('{} 00:00:00'.format(date_from), '%Y-%m-%d %H:%M:%S')
+        limit_to = None
+        if date_to:
+            limit_to = datetime.datetime.strptime('{} 23:59:59'.format(date_to), '%Y-%m-%d %H:%M:%S')
+        # Next page is downloaded and filtered while the current one is processed,
+        # series completed by the checkpoint are skipped
+        pages = PageIterator(
+            lambda page: self._find_valid_series(page, valid_tournament_ids, limit_from, limit_to),
+            lambda headers, page_data: page_data[1].get('last_page', 0))
+        for series_current_page, headers, (valid_series, series) in pages:  # Pagination
+            url_s = self._get_series_url(series_current_page)
+            if 'data' not in series:
+                self._finish_checkpoint(checkpoint)
+                committer.finish()
                 return {'return_msg': 'No data were found for Provider 2.'}
 
-            limit_from = None
-            if date_from:
-                limit_from = datetime.datetime.strptime('{} 00:00:00'.format(date_from), '%Y-%m-%d %H:%M:%S')
-            limit_to = None
-            if date_to:
-                limit_to = datetime.datetime.strptime('{} 23:59:59'.format(date_to), '%Y-%m-%d %H:%M:%S')
-            for serie in series['data']:
-                if serie['tournament_id'] not in valid_tournament_ids:
-                    continue
-                elif ((limit_from and limit_to
-                        and serie['start'] and serie['end']
-                        and (datetime.datetime.strptime(serie['start'], '%Y-%m-%d %H:%M:%S') < limit_from
-                             or datetime.datetime.strptime(serie['end'], '%Y-%m-%d %H:%M:%S') > limit_to))
-                        or (limit_from and serie['start']
-                            and datetime.datetime.strptime(serie['start'], '%Y-%m-%d %H:%M:%S')
-                            < limit_from)
-                        or (limit_to and serie['end']
-                            and datetime.datetime.strptime(serie['end'], '%Y-%m-%d %H:%M:%S')
-                            > limit_to)):
-                    continue
-
+            # Fetch matches of all series on the page concurrently, failed fetch skips only its serie
+            valid_series = [serie for serie in valid_series if serie['id'] not in checkpoint['done_match_ids']]
+            fetched = FetchIterator(
+                lambda serie: self.send_request(api_endpoint=self._get_serie_url(serie)),
+                valid_series, api_config[self._name]['max_concurrency'])
+            for serie, result, error in fetched:
+                url_m = self._get_serie_url(serie)
                 stats['matches_total_count'] += 1
-                url_m = 'series/{}?with[]=matches'.format(serie['id'])
-                headers, matches = self.send_request(api_endpoint=url_m)
+                if error is not None:
+                    self._raise_request_timeout(error)
+                    stats['matches_invalid_count'] += 1
+                    self._log_msg('error', 'Serie matches could not be fetched: {}'.format(error), url=url_m)
+                    self._save_checkpoint_match(checkpoint, serie['id'])
+                    continue
+                headers, matches = result
                 if not self.validator.validate_match(url_m, matches, serie, 'past_game_invalid'):
                     stats['matches_invalid_count'] += 1
+                    self._save_checkpoint_match(checkpoint, serie['id'])
                     continue
 
+                games = []
                 for match in matches['matches']:
                     stats['games_total_count'] += 1
                     existing = cur.qfo('''
@@ -123,24 +124,83 @@ class Grabber(GrabberInterface):
                         if diff_data:
                             common_data['update_datetime'] = datetime.datetime.utcnow()
                             cur.update('past_game_stats', diff_data, conditions={'data_src_game_id': match['id']})
-
-                    url_g = 'matches/{}?with[]=summary'.format(match['id'])
-                    headers, data = self.send_request(api_endpoint=url_g)
-
-                    if not self.validator.validate_game(url_g, stats_game_id, data, match, 'past_game_invalid'):
-                        print(url_g)
-                        stats['games_invalid_count'] += 1
-                        continue
-
-                    # Save team and player game stats
-                    stats['datapoints_missing_count'] += self._save_team_stats(url_m, stats_game_id, data)
-                    stats['datapoints_missing_count'] += self._save_player_stats(url_m, stats_game_id, data)
-
-        # Save statistics into "past_game_analysis" table
-        final_stats = self._transform_stats_and_save_analysis(self._name, stats)
-
-        self.sql.finish_trans_mode()
-        return final_stats
+                    games.append((stats_game_id, match))
+                games_to_save = self._get_games_to_save(checkpoint, games)
+                if len(games_to_save) < len(games):  # Interrupted serie was counted with all its games already
+                    stats['matches_total_count'] -= 1
+                    stats['games_total_count'] -= len(games)
+                    games = games_to_save
+
+                # Fetch summaries of all games of the serie concurrently, failed fetch is failed game
+                fetched = FetchIterator(
+                    lambda game: self.send_request(api_endpoint=self._get_summary_url(game[1])),
+                    games, api_config[self._name]['max_concurrency'])
+                for (stats_game_id, match), result, error in fetched:
+                    url_g = self._get_summary_url(match)
+                    with committer.game(url_g):
+                        self._save_checkpoint_game(checkpoint, match['id'])
+                        if error is not None:
+                            raise error
+                        headers, data = result
+                        if not self.validator.validate_game(url_g, stats_game_id, data, match, 'past_game_invalid'):
+                            print(url_g)
+                            stats['games_invalid_count'] += 1
+                            continue
+
+                        # Save team and player game stats, counted only when the game is saved whole
+                        missing_count = self._save_team_stats(url_m, stats_game_id, data)
+                        missing_count += self._save_player_stats(url_m, stats_game_id, data)
+                        stats['datapoints_missing_count'] += missing_count
+                    if committer.game_failed:  # Counted as invalid, not fetched again by resumed grab
+                        self._save_checkpoint_game(checkpoint, match['id'])
+                self._save_checkpoint_match(checkpoint, serie['id'])
+            self._save_checkpoint_page(checkpoint, series_current_page)
+            committer.page_done()
+
+        # Save rest of statistics into "past_game_analysis" table, returned statistics are of the whole run
+        self._finish_checkpoint(checkpoint)
+        committer.finish()
+        return self._transform_stats(self._name, stats)
+
+
+    def _get_serie_url(self, serie: dict) -> str:
+        return 'series/{}?with[]=matches'.format(serie['id'])
+
+
+    def _get_summary_url(self, match: dict) -> str:
+        return 'matches/{}?with[]=summary'.format(match['id'])
+
+
+    def _get_series_url(self, page: int) -> str:
+        # NOTE: `&tiers[]=1` is not necessary, when we filter tournament ids,
+        # its open to lower levels of tournaments for testing
+        # NOTE: &tournaments[]=123,345 does not work as expected, should be only one ID -> DO NOT USE IT!!!
+        return 'series?games[]={}&with[]=matches&page={}'.format(api_config[self._game_name]['provider1_id'], page)
+
+
+    def _find_valid_series(
+            self, page: int, valid_tournament_ids: list,
+            limit_from: datetime.datetime, limit_to: datetime.datetime) -> tuple:
+        # Series are filtered one by one while the page is downloading, returns (headers, (valid series, page info))
+        headers, series_items, series = self.send_request_stream(
+            api_endpoint=self._get_series_url(page), prefix='data.item')
+        valid_series = []
+        for serie in series_items:
+            if serie['tournament_id'] not in valid_tournament_ids:
+                continue
+            elif ((limit_from and limit_to
+                    and serie['start'] and serie['end']
+                    and (datetime.datetime.strptime(serie['start'], '%Y-%m-%d %H:%M:%S') < limit_from
+                         or datetime.datetime.strptime(serie['end'], '%Y-%m-%d %H:%M:%S') > limit_to))
+                    or (limit_from and serie['start']
+                        and datetime.datetime.strptime(serie['start'], '%Y-%m-%d %H:%M:%S')
+                        < limit_from)
+                    or (limit_to and serie['end']
+                        and datetime.datetime.strptime(serie['end'], '%Y-%m-%d %H:%M:%S')
+                        > limit_to)):
+                continue
+            valid_series.append(serie)
+        return headers, (valid_series, series)
 
 
     def _save_team_stats(
@@ -11,6 +11,8 @@ from lib.libpool import LibPool
 from datanal.grabber import GrabberInterface
 from datanal.validator import get_validator_for_api
 from datanal.transformer import get_transformer_for_api
+from datanal.client.pager import PageIterator
+from datanal.client.fetcher import FetchIterator
 
 
 class Grabber(GrabberInterface):
@@ -22,6 +24,7 @@ class Grabber(GrabberInterface):
     def __init__(self, *args, **kwargs):
         self.sql = self.lib_pool.libsql
         self.send_request = cherrypy.thread_data.client_obj.send_request
+        self.send_request_stream = cherrypy.thread_data.client_obj.send_request_stream
         if 'game_name' in kwargs:
             self._game_name = kwargs['game_name']
         if 'log' in kwargs:
@@ -31,53 +34,62 @@ class Grabber(GrabberInterface):
         super().__init__(*args, **kwargs)
 
 
+    def _log_msg(self, type: str, msg: str, **kwargs) -> None:
+        if self._log:
+            api_config[self._name]['log'] = True
+        if api_config[self._name]['log'] is False:
+            return
+        if not hasattr(self, 'logger'):
+            self.logger = LibPool().logger
+        logdata = {'connection_details': api_config[self._name]}
+        for name, value in kwargs.items():
+            logdata[name] = value
+        if type == 'warning':
+            self.logger.warning(msg, logdata)
+        elif type == 'error':
+            self.logger.error(msg, logdata)
+
+
     def _find_and_save_past_games(
-            self, date_from: datetime.date = None, date_to: datetime.date = None, stats: dict = {}) -> dict:
-        self.sql.start_trans_mode()
+            self, date_from: datetime.date = None, date_to: datetime.date = None, stats: dict = {},
+            checkpoint: dict = None) -> dict:
+        committer = self._get_committer(stats)
         cur = self.sql.cursor()
         # Find games mentioned in configuration, save them in database table `past_game_stats`
         valid_league_ids = list(toolz.itertoolz.unique([
             y[self._name]['league_id'] for x, y in api_config['{}_tournaments'.format(self._game_name)].items()
             if y[self._name] and y[self._name]['league_id']]))
-        matches_last_page = 1  # Fake for loop start
-        matches_current_page = 0
-        while matches_last_page > matches_current_page:  # Pagination
-            matches_current_page += 1
-            url_m = '{}/matches/past?filter[status]=finished&league_id={}&page[size]=100&page[number]={}'.format(
-                api_config[self._game_name]['provider2_slug'],
-                str(valid_league_ids),
-                matches_current_page)
-            matches_headers, matches = self.send_request(api_endpoint=url_m)
-            matches_last_page = self._round_up(int(matches_headers['X-Total']) / int(matches_headers['X-Per-Page']))
-            if not matches:
+        limit_from = None
+        if date_from:
+            limit_from = datetime.datetime.strptime('{} 00:00:00'.format(date_from), '%Y-%m-%d %H:%M:%S')
+        limit_to = None
+        if date_to:
+            limit_to = datetime.datetime.strptime('{} 23:59:59'.format(date_to), '%Y-%m-%d %H:%M:%S')
+        # Next page is downloaded and filtered while the current one is processed,
+        # matches completed by the checkpoint are skipped
+        pages = PageIterator(
+            lambda page: self._find_valid_matches(page, valid_league_ids, limit_from, limit_to),
+            lambda headers, page_data: self._round_up(int(headers['X-Total']) / int(headers['X-Per-Page'])))
+        for matches_current_page, matches_headers, (matches, matches_count) in pages:  # Pagination
+            url_m = self._get_matches_url(valid_league_ids, matches_current_page)
+            if not matches_count and matches_current_page > 1:
+                break  # Listing got shorter while it was walked
+            if not matches_count:
+                self._finish_checkpoint(checkpoint)
+                committer.finish()
                 return {'return_msg': 'No data were found for Provider 1.'}
 
-            limit_from = None
-            if date_from:
-                limit_from = datetime.datetime.strptime('{} 00:00:00'.format(date_from), '%Y-%m-%d %H:%M:%S')
-            limit_to = None
-            if date_to:
-                limit_to = datetime.datetime.strptime('{} 23:59:59'.format(date_to), '%Y-%m-%d %H:%M:%S')
             for match in matches:
-                if match['league_id'] not in valid_league_ids:
-                    continue
-                elif ((limit_from and limit_to
-                      and match['begin_at'] and match['end_at']
-                      and (datetime.datetime.strptime(match['begin_at'], '%Y-%m-%dT%H:%M:%SZ') < limit_from
-                           or datetime.datetime.strptime(match['end_at'], '%Y-%m-%dT%H:%M:%SZ') > limit_to))
-                        or (limit_from and match['begin_at']
-                            and datetime.datetime.strptime(match['begin_at'], '%Y-%m-%dT%H:%M:%SZ')
-                            < limit_from)
-                        or (limit_to and match['end_at']
-                            and datetime.datetime.strptime(match['end_at'], '%Y-%m-%dT%H:%M:%SZ')
-                            > limit_to)):
+                if match['id'] in checkpoint['done_match_ids']:
                     continue
                 stats['matches_total_count'] += 1
                 if not self.validator.validate_match(url_m, match, 'past_game_invalid'):
                     stats['matches_invalid_count'] += 1
+                    self._save_checkpoint_match(checkpoint, match['id'])
                     continue
 
                 teams = [x['opponent']['id'] for x in match['opponents']]
+                games = []
                 for game in match['games']:
                     stats['games_total_count'] += 1
                     existing = cur.qfo('''
@@ -105,24 +117,81 @@ class Grabber(GrabberInterface):
                         if diff_data:
                             common_data['update_datetime'] = datetime.datetime.utcnow()
                             cur.update('past_game_stats', diff_data, conditions={'data_src_game_id': match['id']})
-
-                    url_g = '{}/games/{}'.format(api_config[self._game_name]['provider2_slug'], game['id'])
-                    headers, data = self.send_request(api_endpoint=url_g)
-
-                    if not self.validator.validate_game(url_m, stats_game_id, data, match, 'past_game_invalid'):
-                        stats['games_invalid_count'] += 1
-                        continue
-
-                    # Save team and player game stats
-                    stats['datapoints_unavailable_count'] += self._save_team_stats(
-                        url_g, stats_game_id, game['id'], data, teams, match['games'])
-                    stats['datapoints_unavailable_count'] += self._save_player_stats(url_g, stats_game_id, data)
-
-        # Save statistics into "past_game_analysis" table
-        final_stats = self._transform_stats_and_save_analysis(self._name, stats)
-
-        self.sql.finish_trans_mode()
-        return final_stats
+                    games.append((stats_game_id, game))
+                games_to_save = self._get_games_to_save(checkpoint, games)
+                if len(games_to_save) < len(games):  # Interrupted match was counted with all its games already
+                    stats['matches_total_count'] -= 1
+                    stats['games_total_count'] -= len(games)
+                    games = games_to_save
+
+                # Fetch all games of the match concurrently, failed fetch is failed game
+                fetched = FetchIterator(
+                    lambda game: self.send_request(api_endpoint=self._get_game_url(game[1])),
+                    games, api_config[self._name]['max_concurrency'])
+                for (stats_game_id, game), result, error in fetched:
+                    url_g = self._get_game_url(game)
+                    with committer.game(url_g):
+                        self._save_checkpoint_game(checkpoint, game['id'])
+                        if error is not None:
+                            raise error
+                        headers, data = result
+                        if not self.validator.validate_game(url_m, stats_game_id, data, match, 'past_game_invalid'):
+                            stats['games_invalid_count'] += 1
+                            continue
+
+                        # Save team and player game stats, counted only when the game is saved whole
+                        unavailable_count = self._save_team_stats(
+                            url_g, stats_game_id, game['id'], data, teams, match['games'])
+                        unavailable_count += self._save_player_stats(url_g, stats_game_id, data)
+                        stats['datapoints_unavailable_count'] += unavailable_count
+                    if committer.game_failed:  # Counted as invalid, not fetched again by resumed grab
+                        self._save_checkpoint_game(checkpoint, game['id'])
+                self._save_checkpoint_match(checkpoint, match['id'])
+            self._save_checkpoint_page(checkpoint, matches_current_page)
+            committer.page_done()
+
+        # Save rest of statistics into "past_game_analysis" table, returned statistics are of the whole run
+        self._finish_checkpoint(checkpoint)
+        committer.finish()
+        return self._transform_stats(self._name, stats)
+
+
+    def _get_game_url(self, game: dict) -> str:
+        return '{}/games/{}'.format(api_config[self._game_name]['provider2_slug'], game['id'])
+
+
+    def _get_matches_url(self, valid_league_ids: list, page: int) -> str:
+        return '{}/matches/past?filter[status]=finished&league_id={}&page[size]=100&page[number]={}'.format(
+            api_config[self._game_name]['provider2_slug'],
+            str(valid_league_ids),
+            page)
+
+
+    def _find_valid_matches(
+            self, page: int, valid_league_ids: list,
+            limit_from: datetime.datetime, limit_to: datetime.datetime) -> tuple:
+        # Matches are filtered one by one while the page is downloading, returns (headers, (valid matches, count))
+        matches_headers, matches_items, _ = self.send_request_stream(
+            api_endpoint=self._get_matches_url(valid_league_ids, page), prefix='item')
+        matches = []
+        matches_count = 0
+        for match in matches_items:
+            matches_count += 1
+            if match['league_id'] not in valid_league_ids:
+                continue
+            elif ((limit_from and limit_to
+                  and match['begin_at'] and match['end_at']
+                  and (datetime.datetime.strptime(match['begin_at'], '%Y-%m-%dT%H:%M:%SZ') < limit_from
+                       or datetime.datetime.strptime(match['end_at'], '%Y-%m-%dT%H:%M:%SZ') > limit_to))
+                    or (limit_from and match['begin_at']
+                        and datetime.datetime.strptime(match['begin_at'], '%Y-%m-%dT%H:%M:%SZ')
+                        < limit_from)
+                    or (limit_to and match['end_at']
+                        and datetime.datetime.strptime(match['end_at'], '%Y-%m-%dT%H:%M:%SZ')
+                        > limit_to)):
+                continue
+            matches.append(match)
+        return matches_headers, (matches, matches_count)
 
 
     def _save_team_stats(
@@ -0,0 +1,54 @@
+# -*- coding: UTF-8 -*-
+
+import threading
+from collections import OrderedDict
+
+
+class LastStatsCache(object):
+    '''Process-local LRU cache of the last saved team and player stats per watched game
+
+    Entry is valid only together with the `stats_hash` it was saved with, so stats written by another process
+    (or rolled back) are detected by different hash in `current_game_watch` and loaded from the database again.
+    With `max_size` 0 nothing is cached.
+    '''
+
+    def __init__(self, max_size: int = 1000):
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()  # watch_game_id -> (stats_hash, {'team': ..., 'player': ...})
+        self._stats = {'hits': 0, 'misses': 0}
+
+
+    def get(self, watch_game_id: int, stats_hash: str) -> dict:
+        # Returns {'team': {id: row}, 'player': {id: row}} or None
+        with self._lock:
+            entry = self._cache.get(watch_game_id)
+            if entry is None or stats_hash is None or entry[0] != stats_hash:
+                self._stats['misses'] += 1
+                return None
+            self._cache.move_to_end(watch_game_id)
+            self._stats['hits'] += 1
+            return entry[1]
+
+
+    def set(self, watch_game_id: int, stats_hash: str, last_data: dict) -> None:
+        if self._max_size <= 0:
+            return
+        with self._lock:
+            self._cache[watch_game_id] = (stats_hash, last_data)
+            self._cache.move_to_end(watch_game_id)
+            while len(self._cache) > self._max_size:
+                self._cache.popitem(last=False)
+
+
+    def evict(self, watch_game_id: int) -> None:
+        with self._lock:
+            self._cache.pop(watch_game_id, None)
+
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._cache)
+            stats['max_size'] = self._max_size
+        return stats
@@ -0,0 +1,154 @@
+# -*- coding: UTF-8 -*-
+# flake8: noqa: E303, W503
+
+import pytest
+import cherrypy
+
+from datanal.committer import Committer
+
+
+class FakeSql(object):
+    '''Transactions of `Sql` over a list of rows, records committed rows and calls'''
+
+    def __init__(self):
+        self.calls = []
+        self.committed = []
+        self._rows = []
+        self._savepoints = {}
+
+
+    def insert(self, row: object) -> None:
+        self._rows.append(row)
+
+
+    def start_trans_mode(self) -> None:
+        self.calls.append('start')
+        self._rows = []
+
+
+    def finish_trans_mode(self, action: str = 'commit') -> None:
+        self.calls.append(action)
+        if action == 'commit':
+            self.committed.extend(self._rows)
+        self._rows = []
+
+
+    def savepoint(self, name: str) -> None:
+        self._savepoints[name] = len(self._rows)
+
+
+    def release_savepoint(self, name: str) -> None:
+        del self._savepoints[name]
+
+
+    def rollback_to_savepoint(self, name: str) -> None:
+        del self._rows[self._savepoints[name]:]
+
+
+def save_games(committer: Committer, sql: FakeSql, games: list, failing: tuple = ()) -> None:
+    for game in games:
+        with committer.game(game):
+            sql.insert(game)
+            if game in failing:
+                raise ValueError(game)
+
+
+class TestCommitter(object):
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            Committer(FakeSql(), 'match', 1)
+
+
+    def test_game_mode(self):
+        sql = FakeSql()
+        committer = Committer(sql, 'game', 1)
+        save_games(committer, sql, ['g1', 'g2'])
+        assert sql.committed == ['g1', 'g2']
+        assert sql.calls == ['start', 'commit', 'start', 'commit', 'start']
+
+
+    def test_batch_mode(self):
+        sql = FakeSql()
+        committer = Committer(sql, 'batch', 2)
+        save_games(committer, sql, ['g1', 'g2', 'g3'])
+        assert sql.committed == ['g1', 'g2']
+        committer.page_done()
+        assert sql.committed == ['g1', 'g2', 'g3']
+
+
+    def test_page_mode(self):
+        sql = FakeSql()
+        committer = Committer(sql, 'page', 1)
+        save_games(committer, sql, ['g1', 'g2'])
+        assert sql.committed == []
+        committer.page_done()
+        assert sql.committed == ['g1', 'g2']
+
+
+    def test_run_mode(self):
+        sql = FakeSql()
+        committer = Committer(sql, 'run', 1)
+        save_games(committer, sql, ['g1', 'g2'])
+        committer.page_done()
+        assert sql.committed == []
+        committer.finish()
+        assert sql.committed == ['g1', 'g2']
+
+
+    def test_finish_rollback(self):
+        sql = FakeSql()
+        committer = Committer(sql, 'page', 1)
+        save_games(committer, sql, ['g1'])
+        committer.finish('rollback')
+        assert sql.committed == []
+        assert sql.calls[-1] == 'rollback'
+
+
+    @pytest.mark.parametrize('mode', ['game', 'batch', 'page', 'run'])
+    def test_failed_game_is_rolled_back(self, mode):
+        sql = FakeSql()
+        errors = []
+        committer = Committer(sql, mode, 2, on_error=lambda error, label: errors.append((error.args, label)))
+        save_games(committer, sql, ['g1', 'g2', 'g3'], failing=('g2',))
+        assert not committer.game_failed
+        committer.finish()
+        assert sql.committed == ['g1', 'g3']
+        assert errors == [(('g2',), 'g2')]
+
+
+    def test_game_failed(self):
+        sql = FakeSql()
+        committer = Committer(sql, 'game', 1, on_error=lambda error, label: None)
+        save_games(committer, sql, ['g1'], failing=('g1',))
+        assert committer.game_failed
+        save_games(committer, sql, ['g2'])
+        assert not committer.game_failed
+
+
+    def test_error_without_handler(self):
+        sql = FakeSql()
+        committer = Committer(sql, 'page', 1)
+        with pytest.raises(ValueError):
+            save_games(committer, sql, ['g1', 'g2'], failing=('g2',))
+        committer.finish()
+        assert sql.committed == ['g1']
+
+
+    def test_request_timeout_ends_run(self):
+        sql = FakeSql()
+        errors = []
+        committer = Committer(sql, 'game', 1, on_error=lambda error, label: errors.append(label))
+        with pytest.raises(cherrypy.HTTPError):
+            with committer.game('g1'):
+                raise cherrypy.HTTPError(408)
+        assert errors == []
+
+
+    def test_before_commit(self):
+        sql = FakeSql()
+        committer = Committer(sql, 'batch', 2, before_commit=lambda: sql.insert('progress'))
+        save_games(committer, sql, ['g1', 'g2', 'g3'])
+        assert sql.committed == ['g1', 'g2', 'progress']
+        committer.finish('rollback')
+        assert sql.committed == ['g1', 'g2', 'progress']
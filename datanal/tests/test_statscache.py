@@ -0,0 +1,50 @@
+# -*- coding: UTF-8 -*-
+# flake8: noqa: E303, W503
+
+from datanal.statscache import LastStatsCache
+
+
+class TestLastStatsCache(object):
+
+    def test_hit_with_same_hash(self):
+        cache = LastStatsCache()
+        cache.set(1, 'hash1', {'team': {}, 'player': {}})
+        assert cache.get(1, 'hash1') == {'team': {}, 'player': {}}
+        assert cache.stats()['hits'] == 1
+
+
+    def test_miss_with_other_hash(self):
+        # Stats saved by another process or rolled back
+        cache = LastStatsCache()
+        cache.set(1, 'hash1', {'team': {}, 'player': {}})
+        assert cache.get(1, 'hash2') is None
+        assert cache.get(1, None) is None
+        assert cache.get(2, 'hash1') is None
+        assert cache.stats()['misses'] == 3
+
+
+    def test_least_recently_used_is_dropped(self):
+        cache = LastStatsCache(max_size=2)
+        cache.set(1, 'a', {})
+        cache.set(2, 'b', {})
+        cache.get(1, 'a')
+        cache.set(3, 'c', {})
+        assert cache.get(2, 'b') is None
+        assert cache.get(1, 'a') == {}
+        assert cache.get(3, 'c') == {}
+        assert cache.stats()['size'] == 2
+
+
+    def test_evict(self):
+        cache = LastStatsCache()
+        cache.set(1, 'a', {})
+        cache.evict(1)
+        cache.evict(2)
+        assert cache.get(1, 'a') is None
+
+
+    def test_disabled(self):
+        cache = LastStatsCache(max_size=0)
+        cache.set(1, 'a', {})
+        assert cache.get(1, 'a') is None
+        assert cache.stats() == {'hits': 0, 'misses': 1, 'size': 0, 'max_size': 0}
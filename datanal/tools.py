@@ -2,6 +2,7 @@
 
 from importlib import import_module
 import json
+import hashlib
 from decimal import Decimal
 from typing import NewType
 import os
@@ -9,6 +10,11 @@ import uuid
 from zipfile import ZipFile
 import subprocess
 
+try:
+    import orjson
+except ImportError:  # Optional package, standard json is used without it
+    orjson = None
+
 from lib.libpool import LibPool
 from config.settings import app_config
 from lib.sql.config.settings import db_config
@@ -38,10 +44,28 @@ def default_json_encoder(o):
 
 
 def to_json(data: ListDict, indent: IntStr = None) -> str:
+    if orjson is not None and indent is None:
+        try:
+            return orjson.dumps(data, default=default_json_encoder, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            pass  # Values orjson does not support (e.g. integers over 64 bits), standard json handles them
     out = json.dumps(data, indent=indent, ensure_ascii=False, default=default_json_encoder)
     return out
 
 
+def from_json(data: (str, bytes)) -> ListDict:
+    # Decode JSON document (e.g. body of provider response), orjson is used when installed
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def get_stats_hash(*data: ListDict) -> str:
+    # Canonical hash of transformed stats, equal data give equal hash regardless of key order
+    canonical = json.dumps(data, sort_keys=True, separators=(',', ':'), default=default_json_encoder)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
 def prepare_data_output(type: str, output: str, tmp_file_path: str) -> bool:
     # Save selected data from database to tmp_file_path
     if output == 'sql':
@@ -175,7 +199,7 @@ def get_tournaments(game_name: str) -> True:
     # Return current list of tournaments to watch from JSON file
     tournaments_file_path = os.path.join(tournaments_base_path, '{}_tournaments.json'.format(game_name))
     with open(tournaments_file_path, 'r') as fh:
-        tournaments = json.loads(fh.read())
+        tournaments = from_json(fh.read())
     return {'game_name': game_name, 'tournaments': tournaments}
 
 
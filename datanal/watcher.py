@@ -1,28 +1,56 @@
 # -*- coding: UTF-8 -*-
 
 import os
+import socket
 import datetime
+import threading
 from typing import NewType
 import copy
 
+import cherrypy
 import toolz
+from formencode import Schema, validators, api as formencode_api
 
 from config.default import instance_dirpath
+from datanal.config.api_settings import api_config
 from datanal.tools import import_dynamically
 from datanal.tools import get_time_limit
+from datanal.tools import get_stats_hash
 from datanal.transformer import get_transformer_for_api
+from datanal.client.fetcher import FetchIterator
+from datanal.committer import Committer
+from datanal.statscache import LastStatsCache
 
 
 DictNone = NewType('DictNone', (dict, None))
 
+# Events pushed by provider feed or relay, see /push-event
+PUSH_EVENT_TYPES = ['match_finished', 'stats_updated']
+
 
 class UnknownAdapter(Exception):
     pass
 
 
+class GameDataSchema(Schema):
+    '''Game data as collected, checked by the validator of the provider'''
+    allow_extra_fields = True
+    filter_extra_fields = False
+
+
+class StatsUpdatedSchema(Schema):
+    '''Payload of "stats_updated" event'''
+    allow_extra_fields = True
+    filter_extra_fields = False
+    data_src_game_id = validators.Int(not_empty=True)
+    data = GameDataSchema(not_empty=True)
+
+
 class WatcherInterface(object):
     '''Define the interface that Adapter uses
     '''
+    _last_stats = LastStatsCache(api_config['last_stats_cache_size'])  # Diff baseline shared by watchers of process
+    _event_schemas = {'stats_updated': StatsUpdatedSchema}  # Payload shape of pushed events
 
     def __init__(self, *args, **kwargs):
         self.transformer = get_transformer_for_api(self._name, self._game_name, self._log)
@@ -30,6 +58,16 @@ class WatcherInterface(object):
 
 
     def watch_current_games(self) -> None:
+        committer = Committer(self.sql, on_error=self._log_game_error)
+        try:
+            self._watch_current_games(committer)
+        except Exception:
+            committer.finish('rollback')  # Games already committed by `commit_mode` are kept
+            raise
+        committer.finish()
+
+
+    def _watch_current_games(self, committer: Committer) -> None:
         raise NotImplementedError
 
 
@@ -37,28 +75,418 @@ class WatcherInterface(object):
         raise NotImplementedError
 
 
-    def _solve_changes_count_aftermath(self, changes_count: dict, stats_game_id: int, unchanged_game_id: int) -> None:
+    def ingest_event(self, event_type: str, event_id: str, payload: dict) -> str:
+        # Pushed event goes through the same validation and saving as polled data, watch and collect polling
+        # stays as reconciliation of missed events. Event id is saved with the data in one transaction,
+        # repeated delivery is only acknowledged. Event whose games failed to save is rolled back with its id,
+        # so it can be delivered again. Returns "accepted", "duplicate", "ignored", "invalid" or "failed".
+        try:
+            payload = self._event_schemas[event_type].to_python(payload)
+        except formencode_api.Invalid as e:
+            self._log_msg('error', 'Pushed event "{}" is not valid: {}'.format(event_id, e))
+            return 'invalid'
+
+        committer = Committer(self.sql, mode='run', on_error=self._log_game_error)
+        try:
+            if not self._save_event(event_type, event_id):
+                committer.finish()
+                return 'duplicate'
+            if event_type == 'match_finished':
+                status = self._ingest_match_finished(committer, payload)
+            else:
+                status = self._ingest_stats_updated(committer, payload)
+        except Exception:
+            committer.finish('rollback')  # Event can be delivered again
+            raise
+        committer.finish('rollback' if status == 'failed' else 'commit')
+        return status
+
+
+    def _save_event(self, event_type: str, event_id: str) -> bool:
+        # Returns False when the event was saved already
+        cur = self.sql.cursor()
+        event = cur.qfo('''
+            INSERT INTO "current_game_event" ("data_src", "game_name", "event_id", "event_type")
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT ("data_src", "event_id") DO NOTHING
+            RETURNING "id"
+        ''', [self._name, self._game_name, event_id, event_type])
+        return event is not None
+
+
+    def _ingest_match_finished(self, committer: Committer, payload: dict) -> str:
+        # Finished match of configured tournament is watched as if it was found in the listing
+        candidates = self._get_match_finished_candidates(payload)
+        if not candidates:
+            return 'ignored'
+        if self._save_watch_candidates(committer, candidates):
+            return 'failed'
+        return 'accepted'
+
+
+    def _ingest_stats_updated(self, committer: Committer, payload: dict) -> str:
+        # Stats of watched game are saved as if they were polled, payload "data" is the game data
+        # the collect would fetch, it is validated as game data of the watch. Game leased or locked
+        # by running collect is left to it.
+        cur = self.sql.cursor()
+        poll_datetime = datetime.datetime.utcnow()
+        watch_game = cur.qfo('''
+            SELECT * FROM "current_game_watch"
+            WHERE "is_watching" = true
+            AND "is_deleted" = false
+            AND "data_src" = %(data_src)s
+            AND "game_name" = %(game_name)s
+            AND "data_src_game_id" = %(data_src_game_id)s
+            AND ("lease_expire_datetime" IS NULL OR "lease_expire_datetime" <= %(poll_datetime)s)
+            FOR UPDATE SKIP LOCKED
+        ''', {
+            'data_src': self._name,
+            'game_name': self._game_name,
+            'data_src_game_id': payload['data_src_game_id'],
+            'poll_datetime': poll_datetime
+        })
+        if not watch_game:
+            return 'ignored'
+        url = self._get_game_url(watch_game)
+        if not self._validate_game_data(url, watch_game, payload['data']):
+            return 'invalid'
+        with committer.game(url):
+            self._save_game_data(watch_game, url, payload['data'], poll_datetime)
+        return 'failed' if committer.game_failed else 'accepted'
+
+
+    def _collect_watch_games(self, get_url: callable) -> None:
+        # Look for finished games (not longer than hour ago) mentioned in database table `current_game_watch`
+        # and due to be polled, collect data for them into tables with team and player stats.
+        # Game data are fetched concurrently by bounded worker pool under the provider rate limit,
+        # this thread is the single writer and saves them in order of `watch_games`.
+        # Each game is saved in its own savepoint, failed game is logged and the others go on,
+        # saved games are committed by `commit_mode`.
+        poll_datetime = datetime.datetime.utcnow()
+        lease_owner = '{}:{}:{}'.format(socket.gethostname(), os.getpid(), threading.get_ident())
+        watch_games = self._claim_watch_games(poll_datetime, lease_owner)
+
+        fetched = FetchIterator(
+            lambda watch_game: self.send_request(api_endpoint=get_url(watch_game)),
+            watch_games, api_config[self._name]['collect_concurrency'])
+        committer = Committer(self.sql, on_error=self._log_game_error)
+        try:
+            for watch_game, result, error in fetched:
+                url = get_url(watch_game)
+                if error is not None:
+                    self._raise_request_timeout(error)
+                    self._log_msg('error', 'Game data could not be fetched: {}'.format(error), url=url)
+                else:
+                    headers, data = result
+                    # Cached stats of rolled back game do not match its hash in database and are not used
+                    with committer.game(url):
+                        self._save_game_data(watch_game, url, data, poll_datetime)
+
+                # Set watching false if its over limit now
+                self._check_watching_limit(watch_game['id'], watch_game['insert_datetime'])
+        except Exception:
+            committer.finish('rollback')  # Games already committed by `commit_mode` are kept
+            self._release_watch_games(lease_owner)
+            raise
+        committer.finish()
+        self._release_watch_games(lease_owner)
+
+
+    def _claim_watch_games(self, poll_datetime: datetime.datetime, lease_owner: str) -> list:
+        # Due games are leased to this run, so concurrent collectors (threads, processes or hosts) of the same
+        # data source and game do not poll them twice. Rows locked by other claim are skipped, lease of dead
+        # collector expires after `collect_lease_ttl` seconds. With `collect_lease_ttl` 0 games are not leased.
+        cur = self.sql.cursor()
+        params = {
+            'data_src': self._name,
+            'game_name': self._game_name,
+            'poll_datetime': poll_datetime,
+            'lease_owner': lease_owner,
+            'lease_expire_datetime': poll_datetime + datetime.timedelta(seconds=api_config['collect_lease_ttl'])
+        }
+        due_conditions = '''
+            "is_watching" = true
+            AND "is_deleted" = false
+            AND "data_src" = %(data_src)s
+            AND "game_name" = %(game_name)s
+            AND ("next_poll_datetime" IS NULL OR "next_poll_datetime" <= %(poll_datetime)s)
+        '''
+        if not api_config['collect_lease_ttl']:
+            return cur.qfa('SELECT * FROM "current_game_watch" WHERE {}'.format(due_conditions), params)
+        return cur.qfa('''
+            UPDATE "current_game_watch" SET
+                "lease_owner" = %(lease_owner)s,
+                "lease_expire_datetime" = %(lease_expire_datetime)s
+            WHERE "id" IN (
+                SELECT "id" FROM "current_game_watch"
+                WHERE {}
+                AND ("lease_expire_datetime" IS NULL OR "lease_expire_datetime" <= %(poll_datetime)s)
+                ORDER BY "id"
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING *
+        '''.format(due_conditions), params)
+
+
+    def _release_watch_games(self, lease_owner: str) -> None:
+        # Games not saved by this run (failed or not fetched) can be claimed by the next one right away
+        if not api_config['collect_lease_ttl']:
+            return
+        cur = self.sql.cursor()
+        cur.q('''
+            UPDATE "current_game_watch" SET
+                "lease_owner" = NULL,
+                "lease_expire_datetime" = NULL
+            WHERE "lease_owner" = %s
+        ''', [lease_owner])
+
+
+    def _log_game_error(self, error: Exception, url: str) -> None:
+        self._log_msg('error', 'Game data could not be saved: {}'.format(error), url=url)
+
+
+    def _raise_request_timeout(self, error: Exception) -> None:
+        # Application request timeout ends whole collection, other errors are isolated to the game
+        if isinstance(error, cherrypy.HTTPError) and error.status == 408:
+            raise error
+
+
+    def _save_game_data(self, watch_game: dict, url: str, data: dict, poll_datetime: datetime.datetime) -> None:
+        teams_data = self._get_teams_data(watch_game, data)
+        players_data = self._get_players_data(data)
+
+        # Same stats as saved last time, only the poll is recorded without stats rows
+        stats_hash = get_stats_hash(teams_data, players_data)
+        if stats_hash == watch_game.get('stats_hash'):
+            self._save_unchanged_poll(watch_game['id'], url)
+            self._schedule_next_poll(watch_game, poll_datetime, False)
+            return
+
+        # Load last stats to have a data for comparison, from memory when this process saved them
+        last_data = self._get_last_stats(watch_game)
+
+        # Save game stats connection object
+        stats_game_id, unchanged_game_id = self._save_game_stats_connection_objects(watch_game['id'])
+
+        # Save team and player game stats
+        changes_count = {}
+        changes_count['team'] = self._save_team_stats(
+            url, stats_game_id, unchanged_game_id, teams_data, last_data['team'])
+        changes_count['player'] = self._save_player_stats(
+            url, stats_game_id, unchanged_game_id, players_data, last_data['player'])
+        changed = self._solve_changes_count_aftermath(changes_count, stats_game_id, unchanged_game_id)
+        self._schedule_next_poll(watch_game, poll_datetime, changed, {'stats_hash': stats_hash})
+        common_data = {'data_src_url': url}
+        self._last_stats.set(watch_game['id'], stats_hash, {
+            'team': toolz.dicttoolz.merge(last_data['team'], toolz.dicttoolz.valmap(
+                lambda x: toolz.dicttoolz.merge(common_data, x), teams_data)),
+            'player': toolz.dicttoolz.merge(last_data['player'], toolz.dicttoolz.valmap(
+                lambda x: toolz.dicttoolz.merge(common_data, x), players_data))
+        })
+
+
+    def _schedule_next_poll(
+            self, watch_game: dict, poll_datetime: datetime.datetime, changed: bool, data: dict = {}) -> None:
+        # Changed game is polled again after the minimal interval, each unchanged poll in a row doubles it.
+        # Interval counts from start of the collection, so it is not prolonged by time of the collection.
+        unchanged_polls = 0 if changed else (watch_game.get('unchanged_polls') or 0) + 1
+        interval = min(api_config['poll_interval_min'] * 2 ** min(unchanged_polls, 16), api_config['poll_interval_max'])
+        cur = self.sql.cursor()
+        cur.update('current_game_watch', toolz.dicttoolz.merge(data, {
+            'unchanged_polls': unchanged_polls,
+            'next_poll_datetime': poll_datetime + datetime.timedelta(seconds=interval)
+        }), {'id': watch_game['id']})
+
+
+    def _get_last_stats(self, watch_game: dict) -> dict:
+        last_data = self._last_stats.get(watch_game['id'], watch_game.get('stats_hash'))
+        if last_data is None:
+            # Not saved by this process yet (or restarted), database has the same data
+            last_data = {key: self._get_last_data(watch_game['id'], key) for key in ['team', 'player']}
+        return last_data
+
+
+    def _get_teams_data(self, watch_game: dict, data: dict) -> dict:
+        raise NotImplementedError
+
+
+    def _get_game_url(self, watch_game: dict) -> str:
+        raise NotImplementedError
+
+
+    def _get_match_finished_candidates(self, payload: dict) -> list:
+        raise NotImplementedError
+
+
+    def _validate_game_data(self, url: str, watch_game: dict, data: dict) -> bool:
+        raise NotImplementedError
+
+
+    def _get_summary_url(self, payload: dict) -> str:
+        raise NotImplementedError
+
+
+    def _validate_summary(self, watch_game_id: int, data: dict, payload: dict) -> bool:
+        raise NotImplementedError
+
+
+    def _get_candidate_watermark(self, candidate: tuple) -> tuple:
+        raise NotImplementedError
+
+
+    def _save_watch_candidates(self, committer: Committer, candidates: list) -> list:
+        # Summaries of games not watched yet are fetched concurrently, fetched games are saved at once
+        # and validated one by one. Games are saved hidden (not watching, deleted), so collectors do not claim
+        # them and the next watch finds them again until their validation is committed. Failed fetch, save
+        # or validation is isolated to its games, they are not kept in `current_game_watch` and the next
+        # watch finds them again. Returns failed candidates.
+        new_candidates = self._get_new_watch_candidates(candidates)
+        fetched = FetchIterator(
+            lambda candidate: self.send_request(api_endpoint=self._get_summary_url(candidate[1])),
+            new_candidates, api_config[self._name]['max_concurrency'])
+        failed = []
+        summaries = []
+        for (common_data, payload), result, error in fetched:
+            if error is not None:
+                self._raise_request_timeout(error)
+                self._log_msg('error', 'Game summary could not be fetched: {}'.format(error),
+                              url=self._get_summary_url(payload))
+                failed.append((common_data, payload))
+            else:
+                headers, data = result
+                hidden_data = toolz.dicttoolz.merge(common_data, {'is_watching': False, 'is_deleted': True})
+                summaries.append((hidden_data, (common_data, payload, data)))
+
+        new_games = []
+        with committer.game('current_game_watch'):
+            new_games = self._save_new_watch_games(summaries)
+        if committer.game_failed:
+            return failed + [(common_data, payload) for common_data, (_, payload, data) in summaries]
+
+        cur = self.sql.cursor()
+        for watch_game_id, (common_data, payload, data) in new_games:
+            with committer.game(self._get_summary_url(payload)):
+                # Invalid game is kept not watching, as found, so the next watch does not fetch it again
+                is_valid = self._validate_summary(watch_game_id, data, payload)
+                cur.update('current_game_watch', {'is_watching': is_valid, 'is_deleted': False}, {'id': watch_game_id})
+            if committer.game_failed:
+                cur.q('''DELETE FROM "current_game_watch" WHERE "id" = %s''', [watch_game_id])
+                failed.append((common_data, payload))
+        return failed
+
+
+    def _cap_watermarks(self, last_finishes: dict, failed: list) -> dict:
+        # Watermark does not pass the oldest game that failed to be fetched or saved,
+        # the next watches list it again while it is in the watch window
+        for candidate in failed:
+            tournament_id, finish_datetime = self._get_candidate_watermark(candidate)
+            if tournament_id not in last_finishes:
+                continue
+            if finish_datetime is None:
+                del last_finishes[tournament_id]  # Unknown finish, watermark is kept where it is
+            elif finish_datetime < last_finishes[tournament_id]:
+                last_finishes[tournament_id] = finish_datetime
+        return last_finishes
+
+
+    def _get_players_data(self, data: dict) -> dict:
+        prepared_data = self.transformer.prepare_players_data(data)
+        return self.transformer.get_players_data(prepared_data, data)
+
+
+    def _solve_changes_count_aftermath(self, changes_count: dict, stats_game_id: int, unchanged_game_id: int) -> bool:
+        # Returns False when no stats changed since the last poll
         cur = self.sql.cursor()
         if changes_count['team'] is None and changes_count['player'] is None:
             # changes_count == -1 -> First stats saved
             # First stats saved can be removed, they are only in stats tables
             cur.q('''DELETE FROM "current_game_unchanged" WHERE "id" = %s''', [unchanged_game_id])
+            return True
         elif sum(changes_count['team'].values()) == 0 and sum(changes_count['player'].values()) == 0:
             # Equal stats can be removed, they are only in unchanged tables
             cur.q('''DELETE FROM "current_game_stats" WHERE "id" = %s''', [stats_game_id])
+            return False
         else:
             # changes_count > 0 -> Changed stats saved
             # Delete obsolete entry
             for key in ['team', 'player']:
                 for data_id, count in changes_count[key].items():
                     if count == 0:
-                        var = 'stats'
+                        var, game_id = 'stats', stats_game_id
                     else:
-                        var = 'unchanged'
+                        var, game_id = 'unchanged', unchanged_game_id
                     cur.q('''
                         DELETE FROM "current_game_{key}_{var}"
                         WHERE "stats_game_id" = %s AND "data_src_{key}_id" = %s
-                    '''.format(key=key, var=var), [stats_game_id, data_id])
+                    '''.format(key=key, var=var), [game_id, data_id])
+            return True
+
+
+    def _get_new_watch_candidates(self, candidates: list) -> list:
+        # Games not watched yet by one lookup, candidates: [(common_data, payload)]
+        unique_candidates = list(toolz.itertoolz.unique(candidates, key=lambda x: x[0]['data_src_game_id']))
+        if not unique_candidates:
+            return []
+        cur = self.sql.cursor()
+        existing = cur.qfa('''
+            SELECT "data_src_game_id" FROM "current_game_watch"
+            WHERE "data_src_game_id" IN %s
+            AND "is_deleted" = false
+        ''', [[common_data['data_src_game_id'] for common_data, payload in unique_candidates]],
+            key='data_src_game_id')
+        return [x for x in unique_candidates if x[0]['data_src_game_id'] not in existing]
+
+
+    def _save_new_watch_games(self, candidates: list) -> list:
+        # Save new games into `current_game_watch` by one insert
+        # candidates: [(common_data, payload)], returns [(watch_game_id, payload)]
+        if not candidates:
+            return []
+        cur = self.sql.cursor()
+        watch_game_ids = cur.insert_many('current_game_watch', [common_data for common_data, payload in candidates])
+        return [(watch_game_id, payload)
+                for watch_game_id, (common_data, payload) in zip(watch_game_ids, candidates)]
+
+
+    def _get_watch_cutoffs(self, tournament_ids: list) -> dict:
+        # Oldest finish of series the watch is interested in per tournament, `time_limit` minutes ago,
+        # or its watermark when all series finished before were seen already. `watermark_overlap` minutes
+        # before the watermark are listed again for series published later than they finished.
+        if not tournament_ids:
+            return {}
+        limit_datetime = datetime.datetime.utcnow() - datetime.timedelta(minutes=self.time_limit)
+        cur = self.sql.cursor()
+        watermarks = cur.qfa('''
+            SELECT "data_src_tournament_id", "last_finish_datetime" FROM "current_game_watermark"
+            WHERE "data_src" = %s
+            AND "game_name" = %s
+            AND "data_src_tournament_id" IN %s
+        ''', [self._name, self._game_name, list(tournament_ids)], key='data_src_tournament_id')
+        overlap = datetime.timedelta(minutes=api_config['watermark_overlap'])
+        return {
+            tournament_id: max(limit_datetime, watermarks[tournament_id]['last_finish_datetime'] - overlap)
+            if tournament_id in watermarks else limit_datetime
+            for tournament_id in tournament_ids}
+
+
+    def _save_watermarks(self, last_finishes: dict) -> None:
+        # last_finishes: {tournament_id: newest finish datetime of its series listed by the watch}
+        cur = self.sql.cursor()
+        for tournament_id, last_finish_datetime in last_finishes.items():
+            cur.q('''
+                INSERT INTO "current_game_watermark"
+                    ("data_src", "game_name", "data_src_tournament_id", "last_finish_datetime", "update_datetime")
+                VALUES (%(data_src)s, %(game_name)s, %(tournament_id)s, %(last_finish_datetime)s, now())
+                ON CONFLICT ("data_src", "game_name", "data_src_tournament_id") DO UPDATE SET
+                    "last_finish_datetime" = GREATEST(
+                        "current_game_watermark"."last_finish_datetime", EXCLUDED."last_finish_datetime"),
+                    "update_datetime" = EXCLUDED."update_datetime"
+            ''', {
+                'data_src': self._name,
+                'game_name': self._game_name,
+                'tournament_id': tournament_id,
+                'last_finish_datetime': last_finish_datetime
+            })
 
 
     def _save_game_stats_connection_objects(self, watch_game_id: int) -> tuple:
@@ -77,16 +505,14 @@ class WatcherInterface(object):
         return stats_game_id, unchanged_game_id
 
 
-    def _get_previous_game_id(self, watch_game_id: int) -> int:
+    def _save_unchanged_poll(self, watch_game_id: int, url: str) -> None:
+        # Poll with the same stats as the last saved ones, team and player rows are not repeated
         cur = self.sql.cursor()
-        prev_stats_game = cur.qfo('''
-            SELECT "id" FROM "current_game_stats"
-            WHERE "watch_game_id" = %s ORDER BY "id" DESC LIMIT 1
-        ''', [watch_game_id])
-        prev_stats_game_id = 0
-        if prev_stats_game:
-            prev_stats_game_id = prev_stats_game['id']
-        return prev_stats_game_id
+        cur.insert('current_game_unchanged', {
+            'watch_game_id': watch_game_id,
+            'data_src_url': url,
+            'insert_datetime': datetime.datetime.utcnow()
+        })
 
 
     def _check_watching_limit(self, watch_game_id: int, watch_insert_datetime: datetime.datetime) -> int:
@@ -94,21 +520,35 @@ class WatcherInterface(object):
         limit_datetime = watch_insert_datetime + datetime.timedelta(minutes=self.time_limit)
         if limit_datetime <= datetime.datetime.utcnow():
             cur.update('current_game_watch', {'is_watching': False}, {'id': watch_game_id})
+            self._last_stats.evict(watch_game_id)
 
 
-    def _get_last_data(self, prev_stats_game_id: int, key: str) -> dict:
+    def _get_last_data(self, watch_game_id: int, key: str) -> dict:
+        # Last saved stats of each team or player, changed ones are in stats tables, the others in unchanged tables
         cur = self.sql.cursor()
         return cur.qfa('''
-            SELECT "DS".* FROM "current_game_stats" "S"
-            INNER JOIN "current_game_{}_stats" "DS"
-                ON "DS"."stats_game_id" = "S"."id"
-            WHERE "S"."id" = %s
-        '''.format(key), [prev_stats_game_id], key='data_src_{}_id'.format(key))
-
+            SELECT DISTINCT ON ("D"."data_src_{key}_id") "D".* FROM (
+                SELECT "DS".*, "S"."insert_datetime" AS "poll_datetime" FROM "current_game_stats" "S"
+                INNER JOIN "current_game_{key}_stats" "DS"
+                    ON "DS"."stats_game_id" = "S"."id"
+                WHERE "S"."watch_game_id" = %(watch_game_id)s
+                UNION ALL
+                SELECT "DU".*, "U"."insert_datetime" AS "poll_datetime" FROM "current_game_unchanged" "U"
+                INNER JOIN "current_game_{key}_unchanged" "DU"
+                    ON "DU"."stats_game_id" = "U"."id"
+                WHERE "U"."watch_game_id" = %(watch_game_id)s
+            ) "D"
+            ORDER BY "D"."data_src_{key}_id", "D"."poll_datetime" DESC
+        '''.format(key=key), {'watch_game_id': watch_game_id}, key='data_src_{}_id'.format(key))
+
+
+    def _save_team_stats(
+            self, url: str, stats_game_id: int, unchanged_game_id: int,
+            teams_data: dict, last_data: dict) -> DictNone:
+        common_data = {
+            'data_src_url': url
+        }
 
-    def _save_team_stats_common(
-            self, stats_game_id: int, unchanged_game_id: int,
-            common_data: dict, teams_data: dict, last_data: dict) -> dict:
         cur = self.sql.cursor()
         count_changes = {}
         for team_id, team_data in teams_data.items():
@@ -129,15 +569,11 @@ class WatcherInterface(object):
 
 
     def _save_player_stats(
-            self, url: str, stats_game_id: int, prev_stats_game_id: int,
-            unchanged_game_id: int, data: dict) -> DictNone:
-        # Load last stats to have a data for comparison
-        last_data = self._get_last_data(prev_stats_game_id, 'player')
-        prepared_data = self.transformer.prepare_players_data(data)
+            self, url: str, stats_game_id: int, unchanged_game_id: int,
+            players_data: dict, last_data: dict) -> DictNone:
         common_data = {
             'data_src_url': url
         }
-        players_data = self.transformer.get_players_data(prepared_data, data)
 
         cur = self.sql.cursor()
         count_changes = {}
@@ -161,7 +597,7 @@ class WatcherInterface(object):
         count_changes = 0
         for name in field_keys:
             if (len(last_data) > 0 and name in now_data
-                    and last_data[last_data_key][name] != now_data[name]):
+                    and (last_data_key not in last_data or last_data[last_data_key][name] != now_data[name])):
                 count_changes += 1
         return count_changes
 
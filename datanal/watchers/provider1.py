@@ -5,27 +5,63 @@ from typing import NewType
 
 import cherrypy
 import toolz
+from formencode import Schema, ForEach, validators
 
 from lib.libpool import LibPool
 from datanal.config.api_settings import api_config
-from datanal.watcher import WatcherInterface
+from datanal.watcher import WatcherInterface, StatsUpdatedSchema
 from datanal.tools import get_time_limit
 from datanal.validator import get_validator_for_api
 from datanal.transformer import get_transformer_for_api
+from datanal.client.pager import PageIterator
+from datanal.client.fetcher import FetchIterator
+from datanal.committer import Committer
 
 
 DictNone = NewType('DictNone', (dict, None))
 
 
+class SerieSchema(Schema):
+    allow_extra_fields = True
+    filter_extra_fields = False
+    id = validators.Int(not_empty=True)
+    tournament_id = validators.Int(not_empty=True)
+
+
+class MatchSchema(Schema):
+    allow_extra_fields = True
+    filter_extra_fields = False
+    id = validators.Int(not_empty=True)
+
+
+class SerieMatchesSchema(Schema):
+    allow_extra_fields = True
+    filter_extra_fields = False
+    title = validators.Wrapper(if_missing=None)
+    start = validators.Wrapper(if_missing=None)
+    end = validators.Wrapper(if_missing=None)
+    matches = ForEach(MatchSchema())
+
+
+class MatchFinishedSchema(Schema):
+    '''Payload of "match_finished" event, serie of the listing and its matches'''
+    allow_extra_fields = True
+    filter_extra_fields = False
+    serie = SerieSchema(not_empty=True)
+    matches = SerieMatchesSchema(not_empty=True)
+
+
 class Watcher(WatcherInterface):
     '''Define concrete Adapter
     '''
     _name = 'provider1'
+    _event_schemas = {'match_finished': MatchFinishedSchema, 'stats_updated': StatsUpdatedSchema}
     lib_pool = LibPool()
 
     def __init__(self, *args, **kwargs):
         self.sql = self.lib_pool.libsql
         self.send_request = cherrypy.thread_data.client_obj.send_request
+        self.send_requests = cherrypy.thread_data.client_obj.send_requests
         if 'game_name' in kwargs:
             self._game_name = kwargs['game_name']
         if 'log' in kwargs:
@@ -52,127 +88,169 @@ class Watcher(WatcherInterface):
             self.logger.error(msg, logdata)
 
 
-    def watch_current_games(self) -> None:
-        self.sql.start_trans_mode()
-        cur = self.sql.cursor()
+    def _watch_current_games(self, committer: Committer) -> None:
         # If there are some new just finished games mentioned in specification founded,
         # save them in database table `current_game_watch`
-        valid_tournament_ids = list(toolz.itertoolz.unique([
-            y[self._name]['tournament_id'] for x, y in api_config['{}_tournaments'.format(self._game_name)].items()
-            if y[self._name] and y[self._name]['tournament_id']]))
+        valid_tournament_ids = self._get_valid_tournament_ids()
         if not valid_tournament_ids:
             msg = 'No valid tournaments were found for Provider 2'
             self._log_msg('error', msg)
             return
-        for tournament_id in valid_tournament_ids:
-            series = {'last_page': 1}  # Fake for loop start
-            series_current_page = 0
-            while series['last_page'] > series_current_page:  # Pagination
-                series_current_page += 1
-                # NOTE: `&tiers[]=1` is not necessary, when we filter tournament ids,
-                # its open to lower levels of tournaments for testing
-                url_s = 'series?games[]={}&with[]=matches&is_over=true&tournaments[]={}&page={}'.format(
-                    api_config[self._game_name]['provider1_id'],
-                    tournament_id,
-                    series_current_page)
-                headers, series = self.send_request(api_endpoint=url_s)
+        # Tournaments are fetched concurrently (their pages and matches of series in watch window) under the provider
+        # rate limit, this thread validates them in order and saves new games of each tournament page at once
+        # (page of `commit_mode`). Pagination of tournament stops at its watermark, series listed by previous watch
+        # are not fetched again.
+        cutoffs = self._get_watch_cutoffs(valid_tournament_ids)
+        fetched = FetchIterator(
+            lambda tournament_id: self._fetch_tournament_series(tournament_id, cutoffs[tournament_id]),
+            valid_tournament_ids, api_config[self._name]['watch_concurrency'])
+        last_finishes = {}
+        failed = []
+        for tournament_id, result, error in fetched:
+            if error is not None:
+                self._raise_request_timeout(error)
+                self._log_msg('error', 'Tournament could not be fetched: {}'.format(error), tournament_id=tournament_id)
+                continue
+            pages, last_finish_datetime = result
+            if last_finish_datetime is not None:
+                last_finishes[tournament_id] = last_finish_datetime
+            for url_s, series, series_matches in pages:
                 if not series or 'data' not in series:
                     msg = 'No data were found for Provider 2'
                     self._log_msg('error', msg, url=url_s)
-                    return
-
-                limit_datetime = datetime.datetime.utcnow() - datetime.timedelta(minutes=self.time_limit)
-                for serie in series['data']:
-                    if (serie['end'] is None
-                            or datetime.datetime.strptime(serie['end'], '%Y-%m-%d %H:%M:%S') < limit_datetime):
-                        continue
-
-                    url_m = 'series/{}?with[]=matches'.format(serie['id'])
-                    headers, matches = self.send_request(api_endpoint=url_m)
-                    if not self.validator.validate_match(url_m, matches, serie, 'current_game_invalid'):
-                        continue
-
-                    for match in matches['matches']:
-                        existing = cur.qfo('''
-                            SELECT * FROM "current_game_watch"
-                            WHERE "data_src_game_id" = %(src_game_id)s
-                            AND "is_deleted" = false
-                        ''', params={'src_game_id': match['id']})
-                        if existing:
-                            continue
-
-                        common_data = {
-                            'data_src': self._name,
-                            'game_name': self._game_name,
-                            'data_src_url': url_s,
-                            'data_src_game_id': match['id'],
-                            'data_src_game_title': matches['title'],
-                            'data_src_start_datetime': matches['start'],
-                            'data_src_finish_datetime': matches['end'],
-                            'data_src_tournament_id': serie['tournament_id'],
-                            'data_src_tournament_title': None,
-                            'insert_datetime': datetime.datetime.utcnow(),
-                            'is_watching': True
-                        }
-                        cur.insert('current_game_watch', common_data)
-                        watch_game_id = cur.get_last_id('current_game_watch')
-
-                        url_g = 'matches/{}?with[]=summary'.format(match['id'])
-                        headers, data = self.send_request(api_endpoint=url_g)
-
-                        if not self.validator.validate_game(url_g, watch_game_id, data, match, 'current_game_invalid'):
-                            cur.update('current_game_watch',
-                                       {'is_watching': False, 'is_deleted': True},
-                                       {'id': watch_game_id})
-
-        self.sql.finish_trans_mode()
+                    break
+
+                candidates = []
+                for serie, url_m, matches in series_matches:
+                    candidates.extend(self._get_watch_candidates(url_s, serie, url_m, matches))
+                failed.extend(self._save_watch_candidates(committer, candidates))
+                committer.page_done()
+
+        # Watermarks are moved together with the saved games
+        self._save_watermarks(self._cap_watermarks(last_finishes, failed))
+
+
+    def _get_valid_tournament_ids(self) -> list:
+        return list(toolz.itertoolz.unique([
+            y[self._name]['tournament_id'] for x, y in api_config['{}_tournaments'.format(self._game_name)].items()
+            if y[self._name] and y[self._name]['tournament_id']]))
+
+
+    def _get_watch_candidates(self, url_s: str, serie: dict, url_m: str, matches: dict) -> list:
+        # Games of the valid serie as [(common_data, match)] for `_save_watch_candidates`
+        if not self.validator.validate_match(url_m, matches, serie, 'current_game_invalid'):
+            return []
+        candidates = []
+        for match in matches['matches']:
+            common_data = {
+                'data_src': self._name,
+                'game_name': self._game_name,
+                'data_src_url': url_s,
+                'data_src_game_id': match['id'],
+                'data_src_game_title': matches['title'],
+                'data_src_start_datetime': matches['start'],
+                'data_src_finish_datetime': matches['end'],
+                'data_src_tournament_id': serie['tournament_id'],
+                'data_src_tournament_title': None,
+                'insert_datetime': datetime.datetime.utcnow(),
+                'is_watching': True
+            }
+            candidates.append((common_data, match))
+        return candidates
+
+
+    def _get_summary_url(self, match: dict) -> str:
+        return 'matches/{}?with[]=summary'.format(match['id'])
+
+
+    def _validate_summary(self, watch_game_id: int, data: dict, match: dict) -> bool:
+        url_g = self._get_summary_url(match)
+        return self.validator.validate_game(url_g, watch_game_id, data, match, 'current_game_invalid')
+
+
+    def _get_candidate_watermark(self, candidate: tuple) -> tuple:
+        # Finish of the serie, as in `_get_series_ends`
+        common_data, match = candidate
+        if common_data['data_src_finish_datetime'] is None:
+            return common_data['data_src_tournament_id'], None
+        return common_data['data_src_tournament_id'], datetime.datetime.strptime(
+            common_data['data_src_finish_datetime'], '%Y-%m-%d %H:%M:%S')
+
+
+    def _validate_game_data(self, url: str, watch_game: dict, data: dict) -> bool:
+        # Summary of the match carries its rosters as the match of the serie does
+        return self.validator.validate_game(url, watch_game['id'], data, data, 'current_game_invalid')
+
+
+    def _get_match_finished_candidates(self, payload: dict) -> list:
+        # Pushed event carries the serie of the listing and its matches as returned by `series/<id>?with[]=matches`
+        if payload['serie']['tournament_id'] not in self._get_valid_tournament_ids():
+            return []
+        url_m = 'series/{}?with[]=matches'.format(payload['serie']['id'])
+        return self._get_watch_candidates(url_m, payload['serie'], url_m, payload['matches'])
+
+
+    def _fetch_tournament_series(self, tournament_id: int, cutoff_datetime: datetime.datetime) -> tuple:
+        # Runs in worker thread without database access, returns ([(url_s, series, [(serie, url_m, matches)])],
+        # newest finish of listed series) of the tournament pages down to `cutoff_datetime`.
+        # The last page has no series data and the finish is None when the listing failed.
+        concurrency = api_config[self._name]['watch_concurrency']
+        pages = PageIterator(
+            lambda page: self.send_request(api_endpoint=self._get_series_url(tournament_id, page)),
+            lambda headers, series: series.get('last_page', 0) if series else 0,
+            lambda headers, series: self._is_page_outside_window(series, cutoff_datetime),
+            prefetch=concurrency <= 1)
+        result = []
+        last_finish_datetime = None
+        for series_current_page, headers, series in pages:  # Pagination
+            url_s = self._get_series_url(tournament_id, series_current_page)
+            if not series or 'data' not in series:
+                result.append((url_s, series, []))
+                return result, None
+
+            ends = self._get_series_ends(series)
+            if ends and (last_finish_datetime is None or max(ends.values()) > last_finish_datetime):
+                last_finish_datetime = max(ends.values())
+            valid_series = [
+                serie for serie in series['data'] if serie['id'] in ends and ends[serie['id']] >= cutoff_datetime]
+
+            # Fetch matches of all series on the page concurrently
+            urls_m = ['series/{}?with[]=matches'.format(serie['id']) for serie in valid_series]
+            result.append((url_s, series, [
+                (serie, url_m, matches)
+                for serie, url_m, (headers, matches) in zip(valid_series, urls_m, self.send_requests(urls_m))]))
+        return result, last_finish_datetime
+
+
+    def _get_series_url(self, tournament_id: int, page: int) -> str:
+        # NOTE: `&tiers[]=1` is not necessary, when we filter tournament ids,
+        # its open to lower levels of tournaments for testing
+        return 'series?games[]={}&with[]=matches&is_over=true&tournaments[]={}&page={}'.format(
+            api_config[self._game_name]['provider1_id'],
+            tournament_id,
+            page)
+
+
+    def _get_series_ends(self, series: dict) -> dict:
+        # {serie id: finish datetime} of finished series of the page
+        return {serie['id']: datetime.datetime.strptime(serie['end'], '%Y-%m-%d %H:%M:%S')
+                for serie in (series or {}).get('data', []) if serie['end'] is not None}
+
+
+    def _is_page_outside_window(self, series: dict, cutoff_datetime: datetime.datetime) -> bool:
+        # Newest serie of the page finished before watch window, next pages are older
+        ends = self._get_series_ends(series)
+        return bool(ends) and max(ends.values()) < cutoff_datetime
 
 
     def collect_current_data(self) -> None:
-        # Look for finished games (not longer than hour ago) mentioned in database table `current_game_watch`
-        # and collect data for them into tables with team and player stats
-        self.sql.start_trans_mode()
-        cur = self.sql.cursor()
-        matches = cur.qfa('''
-            SELECT * FROM "current_game_watch"
-            WHERE "is_watching" = true
-            AND "is_deleted" = false
-            AND "data_src" = %s
-            AND "game_name" = %s
-        ''', [self._name, self._game_name])
-
-        for match in matches:
-            url_m = 'matches/{}?with[]=summary'.format(match['data_src_game_id'])
-            headers, data = self.send_request(api_endpoint=url_m)
-
-            # Save game stats connection object
-            stats_game_id, unchanged_game_id = self._save_game_stats_connection_objects(match['id'])
-
-            # Need to find last stats id
-            prev_stats_game_id = self._get_previous_game_id(match['id'])
-
-            # Save team and player game stats
-            changes_count = {}
-            changes_count['team'] = self._save_team_stats(
-                url_m, stats_game_id, prev_stats_game_id, unchanged_game_id, data)
-            changes_count['player'] = self._save_player_stats(
-                url_m, stats_game_id, prev_stats_game_id, unchanged_game_id, data)
-            self._solve_changes_count_aftermath(changes_count, stats_game_id, unchanged_game_id)
-
-            # Set watching false if its over limit now
-            self._check_watching_limit(match['id'], match['insert_datetime'])
-
-        self.sql.finish_trans_mode()
-
-
-    def _save_team_stats(
-            self, url: str, stats_game_id: int, prev_stats_game_id: int,
-            unchanged_game_id: int, data: dict) -> DictNone:
-        # Load last stats to have a data for comparison
-        last_data = self._get_last_data(prev_stats_game_id, 'team')
+        self._collect_watch_games(self._get_game_url)
+
+
+    def _get_game_url(self, watch_game: dict) -> str:
+        return 'matches/{}?with[]=summary'.format(watch_game['data_src_game_id'])
+
+
+    def _get_teams_data(self, match: dict, data: dict) -> dict:
         prepared_data = self.transformer.prepare_teams_data(data)
-        common_data = {
-            'data_src_url': url
-        }
-        teams_data = self.transformer.get_teams_data(prepared_data, data)
-        return self._save_team_stats_common(stats_game_id, unchanged_game_id, common_data, teams_data, last_data)
+        return self.transformer.get_teams_data(prepared_data, data)
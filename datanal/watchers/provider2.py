@@ -6,26 +6,87 @@ import math
 
 import cherrypy
 import toolz
+from formencode import Schema, ForEach, validators
 
 from lib.libpool import LibPool
 from datanal.config.api_settings import api_config
-from datanal.watcher import WatcherInterface
+from datanal.watcher import WatcherInterface, StatsUpdatedSchema
 from datanal.tools import get_time_limit
 from datanal.validator import get_validator_for_api
+from datanal.client.pager import PageIterator
+from datanal.committer import Committer
 
 
 DictNone = NewType('DictNone', (dict, None))
 
 
+class IdSchema(Schema):
+    allow_extra_fields = True
+    filter_extra_fields = False
+    id = validators.Int(not_empty=True)
+
+
+class SerieSchema(Schema):
+    allow_extra_fields = True
+    filter_extra_fields = False
+    full_name = validators.Wrapper(if_missing=None)
+
+
+class MatchSchema(Schema):
+    allow_extra_fields = True
+    filter_extra_fields = False
+    id = validators.Int(not_empty=True)
+    league_id = validators.Int(not_empty=True)
+    serie_id = validators.Int(if_missing=None)
+    serie = SerieSchema(not_empty=True)
+    name = validators.Wrapper(if_missing=None)
+    begin_at = validators.Wrapper(if_missing=None)
+    end_at = validators.Wrapper(if_missing=None)
+    games = ForEach(IdSchema())
+
+
+class MatchFinishedSchema(Schema):
+    '''Payload of "match_finished" event, match as listed with its games'''
+    allow_extra_fields = True
+    filter_extra_fields = False
+    match = MatchSchema(not_empty=True)
+
+
+class OpponentSchema(Schema):
+    allow_extra_fields = True
+    filter_extra_fields = False
+    opponent = IdSchema(not_empty=True)
+
+
+class GameMatchSchema(Schema):
+    allow_extra_fields = True
+    filter_extra_fields = False
+    id = validators.Int(not_empty=True)
+    opponents = ForEach(OpponentSchema())
+
+
+class GameDataSchema(Schema):
+    allow_extra_fields = True
+    filter_extra_fields = False
+    match = GameMatchSchema(not_empty=True)
+
+
+class GameStatsUpdatedSchema(StatsUpdatedSchema):
+    '''Payload of "stats_updated" event, game data carry their match'''
+    data = GameDataSchema(not_empty=True)
+
+
 class Watcher(WatcherInterface):
     '''Define concrete Adapter
     '''
     _name = 'provider2'
+    _event_schemas = {'match_finished': MatchFinishedSchema, 'stats_updated': GameStatsUpdatedSchema}
     lib_pool = LibPool()
 
     def __init__(self, *args, **kwargs):
         self.sql = self.lib_pool.libsql
         self.send_request = cherrypy.thread_data.client_obj.send_request
+        self.send_requests = cherrypy.thread_data.client_obj.send_requests
         if 'game_name' in kwargs:
             self._game_name = kwargs['game_name']
         if 'log' in kwargs:
@@ -51,130 +112,135 @@ class Watcher(WatcherInterface):
             self.logger.error(msg, logdata)
 
 
-    def watch_current_games(self) -> None:
-        self.sql.start_trans_mode()
-        cur = self.sql.cursor()
+    def _watch_current_games(self, committer: Committer) -> None:
         # If there are some new just finished games mentioned in specification founded,
         # save them in database table `current_game_watch`
-        valid_league_ids = list(toolz.itertoolz.unique([
-            y[self._name]['league_id'] for x, y in api_config['{}_tournaments'.format(self._game_name)].items()
-            if y[self._name] and y[self._name]['league_id']]))
+        valid_league_ids = self._get_valid_league_ids()
         if not valid_league_ids:
             msg = 'No valid leagues were found for Provider 1'
             self._log_msg('error', msg)
             return
-        matches_last_page = 1  # Fake for loop start
-        matches_current_page = 0
-        while matches_last_page > matches_current_page:  # Pagination
-            matches_current_page += 1
-            url_m = '{}/matches/past?filter[status]=finished&league_id={}&page[size]=100&page[number]={}'.format(
-                api_config[self._game_name]['provider2_slug'],
-                str(valid_league_ids),
-                matches_current_page)
-            matches_headers, matches = self.send_request(api_endpoint=url_m)
-            matches_last_page = self._round_up(int(matches_headers['X-Total']) / int(matches_headers['X-Per-Page']))
+        # Next page is fetched while the current one is processed, pages older than watch window are skipped.
+        # Listing of all leagues stops at the oldest of their watermarks, matches listed before are not fetched again.
+        cutoffs = self._get_watch_cutoffs(valid_league_ids)
+        pages = PageIterator(
+            lambda page: self.send_request(api_endpoint=self._get_matches_url(valid_league_ids, page)),
+            lambda headers, matches: self._round_up(int(headers['X-Total']) / int(headers['X-Per-Page'])),
+            lambda headers, matches: self._is_page_outside_window(matches, min(cutoffs.values())))
+        last_finishes = {}
+        failed = []
+        for matches_current_page, matches_headers, matches in pages:  # Pagination
+            url_m = self._get_matches_url(valid_league_ids, matches_current_page)
             if not matches:
                 return {'return_msg': 'No data were found for Provider 1.'}
                 msg = 'No data were found for Provider 1'
                 self._log_msg('error', msg, url=url_m)
                 return
 
-            limit_datetime = datetime.datetime.utcnow() - datetime.timedelta(minutes=self.time_limit)
+            candidates = []
             for match in matches:
-                if match['league_id'] not in valid_league_ids:
-                    continue
-                elif (match['end_at'] is None
-                        or datetime.datetime.strptime(match['end_at'], '%Y-%m-%dT%H:%M:%SZ') < limit_datetime):
+                if match['league_id'] not in valid_league_ids or match['end_at'] is None:
                     continue
-                if not self.validator.validate_match(url_m, match, 'current_game_invalid'):
+                end_datetime = datetime.datetime.strptime(match['end_at'], '%Y-%m-%dT%H:%M:%SZ')
+                if end_datetime > last_finishes.get(match['league_id'], datetime.datetime.min):
+                    last_finishes[match['league_id']] = end_datetime
+                if end_datetime < cutoffs[match['league_id']]:
                     continue
+                candidates.extend(self._get_watch_candidates(url_m, match))
+
+            failed.extend(self._save_watch_candidates(committer, candidates))
+            committer.page_done()
+
+        # Watermarks are moved together with the saved games
+        self._save_watermarks(self._cap_watermarks(last_finishes, failed))
+
+
+    def _get_valid_league_ids(self) -> list:
+        return list(toolz.itertoolz.unique([
+            y[self._name]['league_id'] for x, y in api_config['{}_tournaments'.format(self._game_name)].items()
+            if y[self._name] and y[self._name]['league_id']]))
+
+
+    def _get_watch_candidates(self, url_m: str, match: dict) -> list:
+        # Games of the valid match as [(common_data, (game, match, url_m))] for `_save_watch_candidates`
+        if not self.validator.validate_match(url_m, match, 'current_game_invalid'):
+            return []
+        candidates = []
+        for game in match['games']:
+            common_data = {
+                'data_src': self._name,
+                'game_name': self._game_name,
+                'data_src_url': url_m,
+                'data_src_game_id': game['id'],
+                'data_src_game_title': match['name'],
+                'data_src_start_datetime': match['begin_at'],
+                'data_src_finish_datetime': match['end_at'],
+                'data_src_tournament_id': match['serie_id'],
+                'data_src_tournament_title': match['serie']['full_name'],
+                'insert_datetime': datetime.datetime.utcnow(),
+                'is_watching': True
+            }
+            candidates.append((common_data, (game, match, url_m)))
+        return candidates
+
+
+    def _get_summary_url(self, payload: tuple) -> str:
+        game, match, url_m = payload
+        return self._get_game_url({'data_src_game_id': game['id']})
+
+
+    def _validate_summary(self, watch_game_id: int, data: dict, payload: tuple) -> bool:
+        game, match, url_m = payload
+        return self.validator.validate_game(url_m, watch_game_id, data, match, 'current_game_invalid')
+
+
+    def _get_candidate_watermark(self, candidate: tuple) -> tuple:
+        # Watermarks are kept per league
+        common_data, (game, match, url_m) = candidate
+        if match['end_at'] is None:
+            return match['league_id'], None
+        return match['league_id'], datetime.datetime.strptime(match['end_at'], '%Y-%m-%dT%H:%M:%SZ')
 
-                for game in match['games']:
-                    existing = cur.qfo('''
-                        SELECT * FROM "current_game_watch"
-                        WHERE "data_src_game_id" = %(src_game_id)s
-                        AND "is_deleted" = false
-                    ''', params={'src_game_id': game['id']})
-                    if existing:
-                        continue
-
-                    common_data = {
-                        'data_src': self._name,
-                        'game_name': self._game_name,
-                        'data_src_url': url_m,
-                        'data_src_game_id': game['id'],
-                        'data_src_game_title': match['name'],
-                        'data_src_start_datetime': match['begin_at'],
-                        'data_src_finish_datetime': match['end_at'],
-                        'data_src_tournament_id': match['serie_id'],
-                        'data_src_tournament_title': match['serie']['full_name'],
-                        'insert_datetime': datetime.datetime.utcnow(),
-                        'is_watching': True
-                    }
-                    cur.insert('current_game_watch', common_data)
-                    watch_game_id = cur.get_last_id('current_game_watch')
-
-                    url_g = '{}/games/{}'.format(api_config[self._game_name]['provider2_slug'], game['id'])
-                    headers, data = self.send_request(api_endpoint=url_g)
-
-                    if not self.validator.validate_game(url_m, watch_game_id, data, match, 'current_game_invalid'):
-                        cur.update('current_game_watch',
-                                   {'is_watching': False, 'is_deleted': True},
-                                   {'id': watch_game_id})
-
-        self.sql.finish_trans_mode()
+
+    def _validate_game_data(self, url: str, watch_game: dict, data: dict) -> bool:
+        return self.validator.validate_game(url, watch_game['id'], data, data['match'], 'current_game_invalid')
+
+
+    def _get_match_finished_candidates(self, payload: dict) -> list:
+        # Pushed event carries the match as listed by `<slug>/matches/past` with its games
+        if payload['match']['league_id'] not in self._get_valid_league_ids():
+            return []
+        url_m = '{}/matches/{}'.format(api_config[self._game_name]['provider2_slug'], payload['match']['id'])
+        return self._get_watch_candidates(url_m, payload['match'])
+
+
+    def _get_matches_url(self, valid_league_ids: list, page: int) -> str:
+        return '{}/matches/past?filter[status]=finished&league_id={}&page[size]=100&page[number]={}'.format(
+            api_config[self._game_name]['provider2_slug'],
+            str(valid_league_ids),
+            page)
+
+
+    def _is_page_outside_window(self, matches: list, cutoff_datetime: datetime.datetime) -> bool:
+        # Newest match of the page finished before watch window, next pages are older
+        ends = [datetime.datetime.strptime(match['end_at'], '%Y-%m-%dT%H:%M:%SZ')
+                for match in (matches or []) if match['end_at'] is not None]
+        return bool(ends) and max(ends) < cutoff_datetime
 
 
     def collect_current_data(self):
-        # Look for finished games (not longer than hour ago) mentioned in database table `current_game_watch`
-        # and collect data for them into tables with team and player stats
-        self.sql.start_trans_mode()
-        cur = self.sql.cursor()
-        games = cur.qfa('''
-            SELECT * FROM "current_game_watch"
-            WHERE "is_watching" = true
-            AND "is_deleted" = false
-            AND "data_src" = %s
-            AND "game_name" = %s
-        ''', [self._name, self._game_name])
-
-        for game in games:
-            url_g = '{}/games/{}'.format(api_config[self._game_name]['provider2_slug'], game['data_src_game_id'])
-            headers, data = self.send_request(api_endpoint=url_g)
-
-            # Save game stats connection object
-            stats_game_id, unchanged_game_id = self._save_game_stats_connection_objects(game['id'])
-
-            # Need to find last stats id
-            prev_stats_game_id = self._get_previous_game_id(game['id'])
-
-            # Save team and player game stats
-            changes_count = {}
-            changes_count['team'] = self._save_team_stats(
-                url_g, stats_game_id, prev_stats_game_id, unchanged_game_id,
-                game['data_src_game_id'], data, data['match']['games'])
-            changes_count['player'] = self._save_player_stats(
-                url_g, stats_game_id, prev_stats_game_id, unchanged_game_id, data)
-            self._solve_changes_count_aftermath(changes_count, stats_game_id, unchanged_game_id)
-
-            # Set watching false if its over limit now
-            self._check_watching_limit(game['id'], game['insert_datetime'])
-
-        self.sql.finish_trans_mode()
-
-
-    def _save_team_stats(
-            self, url: str, stats_game_id: int, prev_stats_game_id: int,
-            unchanged_game_id: int, game_id: int, data: dict, games_data: dict) -> DictNone:
-        # Load last stats to have a data for comparison
-        last_data = self._get_last_data(prev_stats_game_id, 'team')
+        self._collect_watch_games(self._get_game_url)
+
+
+    def _get_game_url(self, watch_game: dict) -> str:
+        return '{}/games/{}'.format(api_config[self._game_name]['provider2_slug'], watch_game['data_src_game_id'])
+
+
+    def _get_teams_data(self, game: dict, data: dict) -> dict:
         teams = [x['opponent']['id'] for x in data['match']['opponents']]
-        prepared_data = self.transformer.prepare_teams_data(teams, data, game_id, games_data)
-        common_data = {
-            'data_src_url': url
-        }
-        teams_data = self.transformer.get_teams_data(prepared_data, data, teams)
-        return self._save_team_stats_common(stats_game_id, unchanged_game_id, common_data, teams_data, last_data)
+        prepared_data = self.transformer.prepare_teams_data(
+            teams, data, game['data_src_game_id'], data['match']['games'])
+        return self.transformer.get_teams_data(prepared_data, data, teams)
 
 
     def _round_up(self, n, decimals=0):
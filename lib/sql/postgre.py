@@ -145,23 +145,20 @@ class Sql(object):
         conn = self.get_conn()
         conn.autocommit = True
         conn.set_session(isolation_level='READ COMMITTED')
+        cherrypy.thread_data.dbsavepoints = []
 
 
     def start_trans_mode(self) -> None:
         conn = self.get_conn()
         conn.autocommit = False
         conn.set_session(isolation_level='READ COMMITTED')
+        cherrypy.thread_data.dbsavepoints = []
 
 
     def finish_trans_mode(self, action: str = 'commit') -> None:
         if action not in ['commit', 'rollback']:
             raise ValueError('Transaction can be finished with actions commit or rollback only.')
-        if (not hasattr(cherrypy.thread_data, 'dbconn')
-                or not isinstance(getattr(cherrypy.thread_data, 'dbconn'), psycopg2.extensions.connection)):
-            raise ConnectionDoesNotExist('Cannot finish a transaction. Application is not connected to a database.')
-        conn = cherrypy.thread_data.dbconn
-        if conn.autocommit is not False:
-            raise TransactionDoesNotExist('Cannot finish a transaction. Transaction was not started.')
+        conn = self._get_trans_conn('finish a transaction')
 
         if action == 'commit':
             conn.commit()
@@ -170,6 +167,50 @@ class Sql(object):
         self.set_default_autocommit()
 
 
+    def _get_trans_conn(self, action: str) -> psycopg2.extensions.connection:
+        if (not hasattr(cherrypy.thread_data, 'dbconn')
+                or not isinstance(getattr(cherrypy.thread_data, 'dbconn'), psycopg2.extensions.connection)):
+            raise ConnectionDoesNotExist('Cannot {}. Application is not connected to a database.'.format(action))
+        conn = cherrypy.thread_data.dbconn
+        if conn.autocommit is not False:
+            raise TransactionDoesNotExist('Cannot {}. Transaction was not started.'.format(action))
+        return conn
+
+
+    def savepoint(self, name: str) -> None:
+        # Work done after the savepoint can be rolled back without the rest of the transaction
+        conn = self._get_trans_conn('create a savepoint')
+        with conn.cursor() as cursor:
+            cursor.execute('SAVEPOINT {}'.format(self.esc_name(name)))
+        cherrypy.thread_data.dbsavepoints.append(name)
+
+
+    def release_savepoint(self, name: str) -> None:
+        conn = self._get_trans_conn('release a savepoint')
+        with conn.cursor() as cursor:
+            cursor.execute('RELEASE SAVEPOINT {}'.format(self.esc_name(name)))
+        self._pop_savepoint(name)
+
+
+    def rollback_to_savepoint(self, name: str) -> None:
+        # Savepoint is released too, so it can be created again with the same name
+        conn = self._get_trans_conn('rollback to a savepoint')
+        with conn.cursor() as cursor:
+            cursor.execute('ROLLBACK TO SAVEPOINT {0}; RELEASE SAVEPOINT {0}'.format(self.esc_name(name)))
+        self._pop_savepoint(name)
+
+
+    def _pop_savepoint(self, name: str) -> None:
+        # Savepoints created after the released one are released with it
+        savepoints = cherrypy.thread_data.dbsavepoints
+        if name in savepoints:
+            del savepoints[len(savepoints) - savepoints[::-1].index(name) - 1:]
+
+
+    def in_savepoint(self) -> bool:
+        return bool(getattr(cherrypy.thread_data, 'dbsavepoints', None))
+
+
     def esc_name(self, var):
         """ Method escape names of columns, tables, etc.
 
@@ -306,7 +347,8 @@ class SqlCursor(object):
                 log_query = pattern.sub(r'''$\g<key>''', query)
                 self.sql.logger.info(log_query, logdata)
         except (psycopg2.InternalError, psycopg2.ProgrammingError, psycopg2.IntegrityError):
-            self.conn.rollback()
+            if not self.sql.in_savepoint():  # Otherwise the caller rolls back to the savepoint
+                self.conn.rollback()
             raise
         except (psycopg2.InterfaceError, psycopg2.OperationalError):
             if self.conn.autocommit is False:
@@ -362,6 +404,19 @@ class SqlCursor(object):
         return query
 
 
+    def _prepare_insert_many(self, table: str, data_keys: list, returning: str = None) -> str:
+        # Multi-row insert, VALUES are filled by psycopg2.extras.execute_values
+        field_names = []
+        for field in data_keys:
+            field_names.append(self.sql.esc_name(field))
+        query = ('''
+            INSERT INTO {} ({}) VALUES %s''').format(
+            self.sql.esc_name(table), ', '.join(field_names))
+        if returning:
+            query += ' RETURNING {}'.format(self.sql.esc_name(returning))
+        return query
+
+
     def _prepare_update(self, table: str, data_keys: list, conditions_keys: list) -> str:
         query_sets = []
         query_conditions = []
@@ -386,6 +441,33 @@ class SqlCursor(object):
         return self.q(query, params)
 
 
+    def insert_many(self, table: str, data: list, returning: str = 'id') -> list:
+        # Insert rows (dicts with the same keys) by one query, returns `returning` values in order of rows
+        if not data:
+            return []
+        field_types = self.get_table_field_types(table)
+        data_keys = list(data[0].keys())
+        params = []
+        for row in data:
+            for key, value in field_types.items():
+                if value == 17 and key in row:
+                    row[key] = bytearray(row[key])  # Escape bytea value
+            params.append([row[key] for key in data_keys])
+        query = self._prepare_insert_many(table, data_keys, returning).strip()
+        try:
+            result = psycopg2.extras.execute_values(
+                self.cursor, query, params, page_size=len(params), fetch=bool(returning))
+        except (psycopg2.InternalError, psycopg2.ProgrammingError, psycopg2.IntegrityError):
+            if not self.sql.in_savepoint():  # Otherwise the caller rolls back to the savepoint
+                self.conn.rollback()
+            raise
+        self.affected_rows = len(params)
+        tools.check_request_timeout()  # Application hook to return 408 if time is over
+        if not returning:
+            return []
+        return [row[returning] for row in result]
+
+
     def update(self, table: str, data: dict, conditions: dict) -> bool:
         field_types = self.get_table_field_types(table)
         for key, value in field_types.items():
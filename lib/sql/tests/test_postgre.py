@@ -237,6 +237,30 @@ class TestSql(object):
         cur.q('DELETE FROM "_py_test"')
 
 
+    def test_cursor__prepare_insert_many(self, sql):
+        cur = sql.cursor()
+        assert 'INSERT INTO "_py_test" ("id", "name") VALUES %s RETURNING "id"' == \
+            cur._prepare_insert_many('_py_test', ['id', 'name'], 'id').strip()
+        assert 'INSERT INTO "_py_test" ("id", "name") VALUES %s' == \
+            cur._prepare_insert_many('_py_test', ['id', 'name']).strip()
+
+
+    def test_cursor_insert_many(self, sql):
+        cur = sql.cursor()
+        data = [
+            {'id': 1, 'user_id': 1, 'abbrev': 'unique', 'name': 'Test'},
+            {'id': 2, 'user_id': 1, 'abbrev': 'unique2', 'name': 'Test 2'}
+        ]
+        assert [1, 2] == cur.insert_many('_py_test', data)
+        assert 2 == cur.affected_rows
+        assert 2 == len(cur.qfa('SELECT * FROM "_py_test"'))
+        assert [] == cur.insert_many('_py_test', [])
+        # raises
+        with pytest.raises(psycopg2.errors.UniqueViolation):
+            cur.insert_many('_py_test', data[:1])
+        cur.q('DELETE FROM "_py_test"')
+
+
     def test_cursor_update(self, sql):
         cur = sql.cursor()
         cur.q('INSERT INTO "_py_test" ("id", "user_id", "abbrev", "name") VALUES (1, 1, \'unique\', \'Test\')')
@@ -344,6 +368,30 @@ class TestSql(object):
         assert 2 == len(cur.qfa('SELECT * FROM "_py_test_user"'))
 
 
+    def test_savepoint(self, sql):
+        with pytest.raises(TransactionDoesNotExist):
+            sql.savepoint('game')
+        sql.start_trans_mode()
+        cur = sql.cursor()
+        assert False == sql.in_savepoint()
+        # rollback to savepoint keeps the work done before it
+        cur.q('INSERT INTO "_py_test" ("id", "user_id", "abbrev", "name") VALUES (1, 1, \'unique\', \'Test\')')
+        sql.savepoint('game')
+        assert True == sql.in_savepoint()
+        with pytest.raises(psycopg2.IntegrityError):
+            cur.q('INSERT INTO "_py_test" ("id", "user_id", "abbrev", "name") VALUES (1, 1, \'unique\', \'Test\')')
+        sql.rollback_to_savepoint('game')
+        assert False == sql.in_savepoint()
+        # released savepoint keeps its work
+        sql.savepoint('game')
+        cur.q('INSERT INTO "_py_test" ("id", "user_id", "abbrev", "name") VALUES (2, 1, \'unique2\', \'Test 2\')')
+        sql.release_savepoint('game')
+        assert False == sql.in_savepoint()
+        sql.finish_trans_mode()
+        assert [1, 2] == sorted(cur.qfa('SELECT * FROM "_py_test"', key='id').keys())
+        cur.q('DELETE FROM "_py_test"')
+
+
     def test_escape_bytea(self, sql):
         assert False == sql.esc_bytea('')
         assert False == sql.esc_bytea(121)
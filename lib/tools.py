@@ -38,7 +38,10 @@ def set_request_timeout_start() -> None:
 
 
 def check_request_timeout() -> None:
-    if time.perf_counter() - cherrypy.request._start >= app_config['app_request_timeout']:
+    start = getattr(cherrypy.request, '_start', None)
+    if start is None:
+        return  # Not a request thread (background fetch, daemon)
+    if time.perf_counter() - start >= app_config['app_request_timeout']:
         cherrypy.request.show_tracebacks = False  # Disable traceback on Cherrypy html
         raise cherrypy.HTTPError(408, 'Application Request Timeout')
 
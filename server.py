@@ -13,6 +13,7 @@ from config.settings import app_config
 from datanal.config.api_settings import api_config
 from datanal.connector import get_connector_for_api
 from datanal.analyzer import Analyzer
+from datanal.watcher import PUSH_EVENT_TYPES
 from datanal import tools as datanal_tools
 
 
@@ -106,6 +107,30 @@ class Router(object):
         return True
 
 
+    @cherrypy.expose(['push-event'])
+    @cherrypy.tools.json_in()
+    @cherrypy.tools.json_out()
+    def push_event(self) -> str:
+        # Match finished or stats updated event of provider feed (or local relay, see bin/push-event.py),
+        # JSON {"data_src", "game_name", "event_type", "event_id" (optional), "payload"}
+        event = cherrypy.request.json
+        try:
+            self.data_src = event.get('data_src')
+            self.log = event.get('log', True)
+            game_name = validators.OneOf(api_config['game_names']).to_python(event.get('game_name'))
+            event_type = validators.OneOf(PUSH_EVENT_TYPES).to_python(event.get('event_type'))
+            event_id = validators.String(max=255).to_python(event.get('event_id'))
+            if not isinstance(event.get('payload'), dict):
+                raise ValueError('Payload of the event should be an object')
+        except formencode_api.Invalid as exc:
+            return str(exc)
+        except ValueError as exc:
+            return str(exc)
+        if not event_id:
+            event_id = datanal_tools.get_stats_hash(event_type, event['payload'])  # Same event sent again
+        return self.connector.ingest_event(game_name, event_type, event_id, event['payload'])
+
+
     @cherrypy.expose(['analyze-current-data'])
     @cherrypy.tools.json_out()
     def analyze_current_data(
@@ -252,6 +277,17 @@ class Router(object):
         return str(res)
 
 
+    @cherrypy.expose(['client-stats'])
+    @cherrypy.tools.json_out()
+    def client_stats(self, data_src: str, log: bool = True) -> dict:
+        try:
+            self.data_src = data_src
+            self.log = log
+        except formencode_api.Invalid as exc:
+            return str(exc)
+        return self.connector.stats()
+
+
     def _download_complete(self):
         os.unlink(cherrypy.request.tmp_file_path)
 
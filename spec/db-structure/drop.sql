@@ -1,6 +1,12 @@
 
 -- past data
 
+DROP TABLE IF EXISTS "past_game_checkpoint_match" CASCADE;
+DROP TABLE IF EXISTS "past_game_checkpoint_game" CASCADE;
+
+DROP SEQUENCE IF EXISTS "s.past_game_checkpoint" CASCADE;
+DROP TABLE IF EXISTS "past_game_checkpoint" CASCADE;
+
 DROP TABLE IF EXISTS "past_game_analysis" CASCADE;
 
 DROP SEQUENCE IF EXISTS "s.past_game_player_stats" CASCADE;
@@ -18,6 +24,11 @@ DROP TABLE IF EXISTS "past_game_stats" CASCADE;
 
 -- current data
 
+DROP SEQUENCE IF EXISTS "s.current_game_event" CASCADE;
+DROP TABLE IF EXISTS "current_game_event" CASCADE;
+
+DROP TABLE IF EXISTS "current_game_watermark" CASCADE;
+
 DROP TABLE IF EXISTS "current_game_analysis" CASCADE;
 
 DROP SEQUENCE IF EXISTS "s.current_game_player_unchanged" CASCADE;